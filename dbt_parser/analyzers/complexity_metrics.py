@@ -2,7 +2,8 @@
 
 import logging
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
+from operator import attrgetter, mul
 from typing import Any
 
 from dbt_parser.parsers.sql_parser import SqlParser, SqlModelInfo
@@ -10,6 +11,45 @@ from dbt_parser.analyzers.graph_resolver import GraphResolver
 
 logger = logging.getLogger(__name__)
 
+SQL_TOKEN_PATTERN = re.compile(
+    r"(?P<line>^(?=[^\S\n]*\S))"
+    r"|(?P<comment>{#.*?#}|/\*.*?\*/|--[^\n]*)"
+    r"|(?P<string>'[^']*')"
+    r"|(?P<expression>{{)"
+    r"|(?P<statement>{%)"
+    r"|(?P<join>\bjoin\b)"
+    r"|(?P<paren>\()",
+    re.DOTALL | re.MULTILINE | re.IGNORECASE,
+)
+
+def _scan_sql(sql: str) -> tuple[int, int, int, int, int]:
+    """Percorre o SQL uma unica vez contando linhas, joins, parenteses e Jinja.
+
+    Retorna (linhas com conteudo, joins, parenteses, aberturas "{{",
+    aberturas "{%"). Comentarios (SQL e Jinja) e literais de string sao
+    consumidos como um unico token, entao joins e parenteses dentro deles nao
+    sao contados; suas linhas com conteudo continuam contando.
+    """
+    lines = joins = parens = expressions = statements = 0
+    for match in SQL_TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind == "line":
+            lines += 1
+        elif kind == "comment" or kind == "string":
+            text = match.group()
+            if "\n" in text:
+                # As linhas seguintes do token nao passam pela alternativa "line".
+                lines += sum(1 for part in text.split("\n")[1:] if part.strip())
+        elif kind == "paren":
+            parens += 1
+        elif kind == "join":
+            joins += 1
+        elif kind == "expression":
+            expressions += 1
+        elif kind == "statement":
+            statements += 1
+    return lines, joins, parens, expressions, statements
+
 @dataclass
 class ModelComplexity:
     """Metricas de complexidade de um modelo."""
@@ -26,6 +66,32 @@ class ModelComplexity:
     dependents_count: int = 0
     complexity_score: float = 0.0
 
+_ModelPayload = tuple[str, str, int, int, int, int, int]
+
+def _measure_model(
+    name: str,
+    raw_sql: str,
+    cte_count: int,
+    ref_count: int,
+    source_count: int,
+    dependency_depth: int,
+    dependents_count: int,
+) -> ModelComplexity:
+    """Monta as metricas de um modelo a partir de dados ja extraidos (sem score)."""
+    sql_lines, join_count, parens, expressions, statements = _scan_sql(raw_sql)
+    return ModelComplexity(
+        model_name=name,
+        sql_lines=sql_lines,
+        cte_count=cte_count,
+        join_count=join_count,
+        subquery_count=max(0, parens - expressions - cte_count),
+        ref_count=ref_count,
+        source_count=source_count,
+        jinja_block_count=expressions + statements,
+        dependency_depth=dependency_depth,
+        dependents_count=dependents_count,
+    )
+
 class ComplexityMetrics:
     """Calcula metricas de complexidade para modelos dbt."""
 
@@ -40,10 +106,15 @@ class ComplexityMetrics:
         "dependency_depth": 1.2,
         "dependents_count": 0.5,
     }
+    _FIELDS = tuple(WEIGHTS)
+    _WEIGHT_VEC = tuple(WEIGHTS.values())
+    _features = attrgetter(*_FIELDS)
 
     def __init__(self, sql_parser: SqlParser, graph: GraphResolver) -> None:
         self.sql_parser = sql_parser
         self.graph = graph
+        self._cache: list[ModelComplexity] | None = None
+        self._cache_key: tuple[int, int] | None = None
 
     def calculate_model_complexity(self, model_name: str) -> ModelComplexity:
         """Calcula complexidade de um modelo especifico."""
@@ -51,63 +122,60 @@ class ComplexityMetrics:
         if not model:
             return ModelComplexity(model_name=model_name)
 
-        sql = model.raw_sql
-        sql_lines = len([line for line in sql.split("\n") if line.strip()])
-        join_count = len(re.findall(r"\bjoin\b", sql, re.IGNORECASE))
-        subquery_count = sql.count("(") - sql.count("{{")
-        subquery_count = max(0, subquery_count - len(model.ctes))
-
-        jinja_blocks = len(re.findall(r"{{.*?}}", sql, re.DOTALL))
-        jinja_blocks += len(re.findall(r"{%.*?%}", sql, re.DOTALL))
-
-        dep_depth = len(self.graph.get_all_upstream(model_name))
-        dependents = len(self.graph.get_all_downstream(model_name))
-
-        complexity = ModelComplexity(
-            model_name=model_name,
-            sql_lines=sql_lines,
-            cte_count=len(model.ctes),
-            join_count=join_count,
-            subquery_count=subquery_count,
-            ref_count=len(model.refs),
-            source_count=len(model.sources),
-            jinja_block_count=jinja_blocks,
-            dependency_depth=dep_depth,
-            dependents_count=dependents,
-        )
-
+        complexity = _measure_model(*self._payload(model))
         complexity.complexity_score = self._calculate_score(complexity)
         return complexity
 
     def calculate_all(self) -> list[ModelComplexity]:
-        """Calcula complexidade de todos os modelos."""
-        results: list[ModelComplexity] = []
-        for name in self.sql_parser._parsed_models:
-            results.append(self.calculate_model_complexity(name))
-        results.sort(key=lambda m: m.complexity_score, reverse=True)
-        return results
+        """Calcula complexidade de todos os modelos.
+
+        O resultado fica em cache ate que o parser ou o grafo mudem; cada
+        chamada recebe copias, entao alterar o retorno nao corrompe o cache.
+        """
+        return [replace(m) for m in self._ranked()]
+
+    def _ranked(self) -> list[ModelComplexity]:
+        """Lista em cache, ordenada por score; somente leitura."""
+        cache_key = (self.sql_parser.version, self.graph.version)
+        if self._cache is None or self._cache_key != cache_key:
+            results = self._measure_all()
+            for complexity in results:
+                complexity.complexity_score = self._calculate_score(complexity)
+            results.sort(key=lambda m: m.complexity_score, reverse=True)
+            self._cache = results
+            self._cache_key = cache_key
+        return self._cache
+
+    def _payload(self, model: SqlModelInfo) -> _ModelPayload:
+        return (
+            model.name,
+            model.raw_sql,
+            len(model.ctes),
+            len(model.refs),
+            len(model.sources),
+            self.graph.upstream_count(model.name),
+            self.graph.downstream_count(model.name),
+        )
+
+    def _measure_all(self) -> list[ModelComplexity]:
+        """Mede todos os modelos em serie (cada um custa microssegundos)."""
+        return [
+            _measure_model(*self._payload(model))
+            for model in self.sql_parser._parsed_models.values()
+        ]
 
     def _calculate_score(self, metrics: ModelComplexity) -> float:
         """Calcula score ponderado de complexidade."""
-        score = 0.0
-        score += metrics.sql_lines * self.WEIGHTS["sql_lines"]
-        score += metrics.cte_count * self.WEIGHTS["cte_count"]
-        score += metrics.join_count * self.WEIGHTS["join_count"]
-        score += metrics.subquery_count * self.WEIGHTS["subquery_count"]
-        score += metrics.ref_count * self.WEIGHTS["ref_count"]
-        score += metrics.source_count * self.WEIGHTS["source_count"]
-        score += metrics.jinja_block_count * self.WEIGHTS["jinja_block_count"]
-        score += metrics.dependency_depth * self.WEIGHTS["dependency_depth"]
-        score += metrics.dependents_count * self.WEIGHTS["dependents_count"]
+        score = sum(map(mul, self._features(metrics), self._WEIGHT_VEC))
         return round(score, 2)
 
     def get_most_complex(self, top_n: int = 10) -> list[ModelComplexity]:
         """Retorna modelos mais complexos."""
-        return self.calculate_all()[:top_n]
+        return [replace(m) for m in self._ranked()[:top_n]]
 
     def get_complexity_summary(self) -> dict[str, Any]:
         """Retorna resumo de complexidade do projeto."""
-        all_metrics = self.calculate_all()
+        all_metrics = self._ranked()
         if not all_metrics:
             return {"total_models": 0}
 
@@ -0,0 +1,38 @@
+"""Kernels de travessia sobre grafos em formato CSR (compressed sparse row).
+
+Funcoes puras sobre ``array("i")`` e ``bytearray``: nao dependem de
+networkx nem de objetos do analisador; usadas pelo snapshot de linhagem
+de colunas do LineageTracker.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import Any
+
+def build_csr(id_of: dict[str, int], adjacency: Any) -> tuple[array, array]:
+    """Converte uma adjacencia (mapping de nome para vizinhos) em arrays CSR."""
+    indptr = array("i", [0])
+    indices = array("i")
+    for name in id_of:
+        indices.extend(id_of[neighbor] for neighbor in adjacency[name])
+        indptr.append(len(indices))
+    return indptr, indices
+
+def bfs_order(indptr: array, indices: array, start: int) -> list[int]:
+    """BFS a partir de start com mascara de visitados; seguro com ciclos."""
+    visited = bytearray(len(indptr) - 1)
+    visited[start] = 1
+    order: list[int] = []
+    queue = deque([start])
+    while queue:
+        node_id = queue.popleft()
+        for k in range(indptr[node_id], indptr[node_id + 1]):
+            neighbor = indices[k]
+            if visited[neighbor]:
+                continue
+            visited[neighbor] = 1
+            order.append(neighbor)
+            queue.append(neighbor)
+    return order
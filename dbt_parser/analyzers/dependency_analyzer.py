@@ -1,10 +1,12 @@
 """Analisador de dependencias para projetos dbt."""
 
+import heapq
 import logging
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import Any
 
-from dbt_parser.analyzers.graph_resolver import GraphResolver
+from dbt_parser.analyzers.graph_resolver import GraphResolver, nx
 from dbt_parser.parsers.sql_parser import SqlParser
 
 logger = logging.getLogger(__name__)
@@ -38,30 +40,33 @@ class DependencyAnalyzer:
         all_refs = self.sql_parser.get_all_refs()
         all_sources = self.sql_parser.get_all_sources()
 
+        nodes_batch: dict[str, NodeInfo] = {}
+        edges_batch: list[tuple[str, str]] = []
+
         for model_name in self.sql_parser._parsed_models:
             model = self.sql_parser.get_model(model_name)
-            node = NodeInfo(
+            nodes_batch[model_name] = NodeInfo(
                 name=model_name,
                 node_type="model",
                 filepath=str(model.filepath) if model else None,
                 config=model.config if model else {},
             )
-            self.graph.add_node(node)
 
         for model_name, refs in all_refs.items():
             for ref in refs:
-                if ref not in self.graph._nodes:
-                    self.graph.add_node(NodeInfo(name=ref, node_type="model"))
-                self.graph.add_edge(model_name, ref)
+                if ref not in nodes_batch and ref not in self.graph._nodes:
+                    nodes_batch[ref] = NodeInfo(name=ref, node_type="model")
+                edges_batch.append((model_name, ref))
 
         for model_name, sources in all_sources.items():
             for source_name, table_name in sources:
                 source_key = f"{source_name}.{table_name}"
-                if source_key not in self.graph._nodes:
-                    self.graph.add_node(
-                        NodeInfo(name=source_key, node_type="source")
-                    )
-                self.graph.add_edge(model_name, source_key)
+                if source_key not in nodes_batch and source_key not in self.graph._nodes:
+                    nodes_batch[source_key] = NodeInfo(name=source_key, node_type="source")
+                edges_batch.append((model_name, source_key))
+
+        self.graph.add_nodes(nodes_batch.values())
+        self.graph.add_edges(edges_batch)
 
         logger.info(
             "Grafo construido: %d nos, %d arestas",
@@ -71,6 +76,14 @@ class DependencyAnalyzer:
 
     def analyze_model(self, model_name: str) -> DependencyReport:
         """Analisa dependencias de um modelo especifico."""
+        return self._analyze_model(
+            model_name, self.graph.get_root_nodes(), self.graph.get_leaf_nodes()
+        )
+
+    def _analyze_model(
+        self, model_name: str, roots: set[str], leaves: set[str]
+    ) -> DependencyReport:
+        """Monta o relatorio usando conjuntos de raizes e folhas ja calculados."""
         direct_deps = sorted(self.graph.get_dependencies(model_name))
         transitive_deps = sorted(self.graph.get_all_upstream(model_name))
         direct_dependents = sorted(self.graph.get_dependents(model_name))
@@ -83,16 +96,18 @@ class DependencyAnalyzer:
             direct_dependents=direct_dependents,
             transitive_dependents=transitive_dependents,
             depth=len(transitive_deps),
-            is_root=model_name in self.graph.get_root_nodes(),
-            is_leaf=model_name in self.graph.get_leaf_nodes(),
+            is_root=model_name in roots,
+            is_leaf=model_name in leaves,
         )
 
     def analyze_all(self) -> list[DependencyReport]:
         """Analisa dependencias de todos os modelos."""
-        reports: list[DependencyReport] = []
-        for node_name in self.graph.graph.nodes():
-            reports.append(self.analyze_model(node_name))
-        return reports
+        roots = self.graph.get_root_nodes()
+        leaves = self.graph.get_leaf_nodes()
+        return [
+            self._analyze_model(node_name, roots, leaves)
+            for node_name in self.graph.graph.nodes()
+        ]
 
     def find_circular_dependencies(self) -> list[list[str]]:
         """Detecta dependencias circulares."""
@@ -104,28 +119,14 @@ class DependencyAnalyzer:
 
     def get_most_depended_on(self, top_n: int = 10) -> list[tuple[str, int]]:
         """Retorna modelos com mais dependentes."""
-        counts: list[tuple[str, int]] = []
-        for node in self.graph.graph.nodes():
-            dependents = len(self.graph.get_dependents(node))
-            counts.append((node, dependents))
-        return sorted(counts, key=lambda x: x[1], reverse=True)[:top_n]
+        counts = self.graph.graph.in_degree()
+        return heapq.nlargest(top_n, counts, key=itemgetter(1))
 
     def get_most_dependencies(self, top_n: int = 10) -> list[tuple[str, int]]:
         """Retorna modelos com mais dependencias."""
-        counts: list[tuple[str, int]] = []
-        for node in self.graph.graph.nodes():
-            deps = len(self.graph.get_dependencies(node))
-            counts.append((node, deps))
-        return sorted(counts, key=lambda x: x[1], reverse=True)[:top_n]
+        counts = self.graph.graph.out_degree()
+        return heapq.nlargest(top_n, counts, key=itemgetter(1))
 
     def get_isolated_models(self) -> set[str]:
         """Retorna modelos sem dependencias e sem dependentes."""
-        isolated = set()
-        for node in self.graph.graph.nodes():
-            if (
-                self.graph.graph.in_degree(node) == 0
-                and self.graph.graph.out_degree(node) == 0
-            ):
-                isolated.add(node)
-        return isolated
-
+        return set(nx.isolates(self.graph.graph))
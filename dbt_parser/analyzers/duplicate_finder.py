@@ -2,14 +2,24 @@
 
 import hashlib
 import logging
+import math
 import re
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterable
 
 from dbt_parser.parsers.sql_parser import SqlParser
 
 logger = logging.getLogger(__name__)
 
+BLOCK_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+LINE_COMMENT_PATTERN = re.compile(r"--.*$", re.MULTILINE)
+JINJA_EXPRESSION_PATTERN = re.compile(r"{{.*?}}", re.DOTALL)
+JINJA_STATEMENT_PATTERN = re.compile(r"{%.*?%}", re.DOTALL)
+STRING_LITERAL_PATTERN = re.compile(r"'\w+'")
+NUMBER_PATTERN = re.compile(r"\b\d+\b")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 @dataclass
 class DuplicateGroup:
     """Grupo de modelos com logica similar."""
@@ -19,83 +29,199 @@ class DuplicateGroup:
     similarity_score: float = 0.0
     pattern_description: str = ""
 
+@dataclass
+class _ModelScan:
+    """Resultado de uma unica passada sobre os modelos parseados."""
+
+    cte_map: dict[str, list[str]] = field(default_factory=lambda: defaultdict(list))
+    config_map: dict[tuple[tuple[str, str], ...], list[str]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+    normalized: dict[str, str] = field(default_factory=dict)
+    token_sets: dict[str, frozenset[str]] = field(default_factory=dict)
+
+class _UnionFind:
+    """Conjuntos disjuntos com compressao de caminho e uniao por tamanho."""
+
+    def __init__(self, items: Iterable[str]) -> None:
+        self._parent = {item: item for item in items}
+        self._size = dict.fromkeys(self._parent, 1)
+
+    def find(self, item: str) -> str:
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self._size[root_a] < self._size[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        self._size[root_a] += self._size[root_b]
+
 class DuplicateFinder:
     """Detecta padroes SQL duplicados em modelos dbt."""
 
     def __init__(self, sql_parser: SqlParser) -> None:
         self.sql_parser = sql_parser
+        self._norm_cache: dict[str, str] = {}
 
-    def find_duplicate_ctes(self) -> dict[str, list[str]]:
-        """Encontra CTEs com nomes identicos em modelos diferentes."""
-        cte_map: dict[str, list[str]] = {}
+    def _scan_all(self) -> _ModelScan:
+        """Percorre os modelos uma unica vez coletando CTEs, configs e tokens."""
+        scan = _ModelScan()
         for name, model in self.sql_parser._parsed_models.items():
             for cte in model.ctes:
-                if cte not in cte_map:
-                    cte_map[cte] = []
-                cte_map[cte].append(name)
+                scan.cte_map[cte].append(name)
+            if model.config:
+                scan.config_map[tuple(sorted(model.config.items()))].append(name)
+            normalized = self._get_normalized_sql(model.raw_sql)
+            scan.normalized[name] = normalized
+            scan.token_sets[name] = frozenset(normalized.split())
+        return scan
+
+    def find_duplicate_ctes(self) -> dict[str, list[str]]:
+        """Encontra CTEs com nomes identicos em modelos diferentes."""
+        return self._duplicate_ctes(self._scan_all())
 
-        return {cte: models for cte, models in cte_map.items() if len(models) > 1}
+    @staticmethod
+    def _duplicate_ctes(scan: _ModelScan) -> dict[str, list[str]]:
+        return {cte: models for cte, models in scan.cte_map.items() if len(models) > 1}
 
     def find_similar_models(self, threshold: float = 0.7) -> list[DuplicateGroup]:
         """Encontra modelos com SQL estruturalmente similar."""
-        models = list(self.sql_parser._parsed_models.items())
-        groups: list[DuplicateGroup] = []
-        processed: set[str] = set()
+        return self._similar_models(self._scan_all(), threshold)
 
-        for i, (name1, model1) in enumerate(models):
-            if name1 in processed:
+    def _similar_models(self, scan: _ModelScan, threshold: float) -> list[DuplicateGroup]:
+        normalized = scan.normalized
+        position = {name: idx for idx, name in enumerate(normalized)}
+
+        # SQL normalizado identico tem Jaccard 1.0: so um representante de
+        # cada bucket exato passa pela etapa de similaridade aproximada.
+        buckets: list[list[str]] = []
+        exact: dict[bytes, list[str]] = {}
+        for name, sql in normalized.items():
+            if not scan.token_sets[name] or threshold > 1.0:
+                buckets.append([name])
                 continue
+            digest = hashlib.blake2b(sql.encode(), digest_size=16).digest()
+            bucket = exact.get(digest)
+            if bucket is None:
+                bucket = exact[digest] = []
+                buckets.append(bucket)
+            bucket.append(name)
 
-            similar: list[str] = [name1]
-            normalized1 = self._normalize_sql(model1.raw_sql)
+        token_sets = {bucket[0]: scan.token_sets[bucket[0]] for bucket in buckets}
+        candidates = self._find_candidate_pairs(token_sets, threshold)
 
-            for j in range(i + 1, len(models)):
-                name2, model2 = models[j]
-                if name2 in processed:
+        components = _UnionFind(token_sets)
+        for name1, others in candidates.items():
+            tokens1 = token_sets[name1]
+            for name2 in others:
+                if name2 <= name1 or components.find(name1) == components.find(name2):
+                    continue
+                tokens2 = token_sets[name2]
+                if self._below_length_bound(len(tokens1), len(tokens2), threshold):
                     continue
+                if self._token_similarity(tokens1, tokens2) >= threshold:
+                    components.union(name1, name2)
 
-                normalized2 = self._normalize_sql(model2.raw_sql)
-                similarity = self._calculate_similarity(normalized1, normalized2)
-
-                if similarity >= threshold:
-                    similar.append(name2)
-                    processed.add(name2)
-
-            if len(similar) > 1:
-                hash_val = hashlib.md5(normalized1.encode()).hexdigest()[:8]
-                groups.append(
-                    DuplicateGroup(
-                        pattern_hash=hash_val,
-                        models=similar,
-                        similarity_score=threshold,
-                        pattern_description=f"Modelos com estrutura SQL similar",
-                    )
+        members: dict[str, list[list[str]]] = defaultdict(list)
+        for bucket in buckets:
+            members[components.find(bucket[0])].append(bucket)
+
+        groups: list[DuplicateGroup] = []
+        for component in members.values():
+            if len(component) == 1:
+                similar, score = component[0], 1.0
+            else:
+                similar = sorted(
+                    (name for bucket in component for name in bucket),
+                    key=position.__getitem__,
+                )
+                score = threshold
+            if len(similar) < 2:
+                continue
+            hash_val = hashlib.blake2b(
+                normalized[similar[0]].encode(), digest_size=4
+            ).hexdigest()
+            groups.append(
+                DuplicateGroup(
+                    pattern_hash=hash_val,
+                    models=similar,
+                    similarity_score=score,
+                    pattern_description=f"Modelos com estrutura SQL similar",
                 )
-                processed.add(name1)
+            )
 
         logger.info("Grupos de duplicados encontrados: %d", len(groups))
         return groups
 
+    @staticmethod
+    def _find_candidate_pairs(
+        token_sets: dict[str, frozenset[str]], threshold: float
+    ) -> dict[str, set[str]]:
+        """Agrupa modelos em buckets por token para gerar pares candidatos.
+
+        Usa prefix filtering: com os tokens ordenados do mais raro ao mais
+        comum, dois conjuntos com Jaccard >= threshold compartilham ao menos
+        um token entre os primeiros len - ceil(threshold * len) + 1 de cada
+        um. So pares que caem no mesmo bucket precisam ser comparados, e
+        nenhum par acima do threshold e descartado.
+        """
+        candidates: dict[str, set[str]] = {name: set() for name in token_sets}
+        if threshold <= 0:
+            for name in token_sets:
+                candidates[name].update(token_sets)
+                candidates[name].discard(name)
+            return candidates
+
+        frequency = Counter(token for tokens in token_sets.values() for token in tokens)
+        buckets: dict[str, list[str]] = defaultdict(list)
+        for name, tokens in token_sets.items():
+            ordered = sorted(tokens, key=lambda t: (frequency[t], t))
+            prefix_len = len(ordered) - math.ceil(threshold * len(ordered) - 1e-9) + 1
+            size = len(tokens)
+            for token in ordered[:prefix_len]:
+                for other in buckets[token]:
+                    if DuplicateFinder._below_length_bound(
+                        size, len(token_sets[other]), threshold
+                    ):
+                        continue
+                    candidates[name].add(other)
+                    candidates[other].add(name)
+                buckets[token].append(name)
+        return candidates
+
     def find_duplicate_configs(self) -> dict[str, list[str]]:
         """Encontra modelos com configuracoes identicas."""
-        config_map: dict[str, list[str]] = {}
-        for name, model in self.sql_parser._parsed_models.items():
-            if model.config:
-                config_key = str(sorted(model.config.items()))
-                if config_key not in config_map:
-                    config_map[config_key] = []
-                config_map[config_key].append(name)
-        return {k: v for k, v in config_map.items() if len(v) > 1}
+        return self._duplicate_configs(self._scan_all())
+
+    @staticmethod
+    def _duplicate_configs(scan: _ModelScan) -> dict[str, list[str]]:
+        return {str(list(k)): v for k, v in scan.config_map.items() if len(v) > 1}
+
+    def _get_normalized_sql(self, sql: str) -> str:
+        """Retorna SQL normalizado, reaproveitando resultados anteriores."""
+        normalized = self._norm_cache.get(sql)
+        if normalized is None:
+            normalized = self._normalize_sql(sql)
+            self._norm_cache[sql] = normalized
+        return normalized
 
     def _normalize_sql(self, sql: str) -> str:
         """Normaliza SQL para comparacao (remove comentarios, whitespace, etc)."""
-        result = re.sub(r"/\*.*?\*/", "", sql, flags=re.DOTALL)
-        result = re.sub(r"--.*$", "", result, flags=re.MULTILINE)
-        result = re.sub(r"{{.*?}}", "JINJA_BLOCK", result, flags=re.DOTALL)
-        result = re.sub(r"{%.*?%}", "", result, flags=re.DOTALL)
-        result = re.sub(r"'\w+'", "STRING", result)
-        result = re.sub(r"\b\d+\b", "NUM", result)
-        result = re.sub(r"\s+", " ", result).strip().lower()
+        result = BLOCK_COMMENT_PATTERN.sub("", sql)
+        result = LINE_COMMENT_PATTERN.sub("", result)
+        result = JINJA_EXPRESSION_PATTERN.sub("JINJA_BLOCK", result)
+        result = JINJA_STATEMENT_PATTERN.sub("", result)
+        result = STRING_LITERAL_PATTERN.sub("STRING", result)
+        result = NUMBER_PATTERN.sub("NUM", result)
+        result = WHITESPACE_PATTERN.sub(" ", result).strip().lower()
         return result
 
     def _calculate_similarity(self, sql1: str, sql2: str) -> float:
@@ -115,11 +241,29 @@ class DuplicateFinder:
         union = tokens1 | tokens2
         return len(intersection) / len(union)
 
+    @staticmethod
+    def _below_length_bound(size1: int, size2: int, threshold: float) -> bool:
+        """Indica se a diferenca de tamanho ja impede Jaccard >= threshold.
+
+        Jaccard nunca passa de min(|A|, |B|) / max(|A|, |B|), entao o par pode
+        ser descartado sem calcular a intersecao.
+        """
+        return min(size1, size2) < threshold * max(size1, size2) - 1e-9
+
+    @staticmethod
+    def _token_similarity(tokens1: frozenset[str], tokens2: frozenset[str]) -> float:
+        """Calcula Jaccard entre conjuntos de tokens ja extraidos."""
+        if not tokens1 or not tokens2:
+            return 0.0
+        intersection = len(tokens1 & tokens2)
+        return intersection / (len(tokens1) + len(tokens2) - intersection)
+
     def get_duplicate_summary(self) -> dict[str, Any]:
         """Retorna resumo de duplicados."""
-        dup_ctes = self.find_duplicate_ctes()
-        similar = self.find_similar_models()
-        dup_configs = self.find_duplicate_configs()
+        scan = self._scan_all()
+        dup_ctes = self._duplicate_ctes(scan)
+        similar = self._similar_models(scan, 0.7)
+        dup_configs = self._duplicate_configs(scan)
 
         return {
             "duplicate_cte_names": len(dup_ctes),
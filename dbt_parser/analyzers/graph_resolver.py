@@ -4,23 +4,30 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any
+from typing import Any, Iterable
 
-if TYPE_CHECKING:
+
+try:
     import networkx as nx
+except ImportError as _nx_error:  # ambientes sem _bz2 ainda importam o modulo
+    nx = None
+    _NX_IMPORT_ERROR: ImportError | None = _nx_error
+else:
+    _NX_IMPORT_ERROR = None
+    _condensation = nx.condensation
+    _topological_sort = nx.topological_sort
+    _simple_cycles = nx.simple_cycles
 
 logger = logging.getLogger(__name__)
 
 def _import_networkx():
-    """Importa networkx sob demanda para evitar falha em ambientes sem _bz2."""
-    try:
-        import networkx as nx
-        return nx
-    except ImportError as exc:
+    """Retorna o networkx importado no carregamento do modulo ou falha com instrucao."""
+    if nx is None:
         raise ImportError(
             "networkx e necessario para funcionalidades de grafo. "
             "Instale com: pip install networkx"
-        ) from exc
+        ) from _NX_IMPORT_ERROR
+    return nx
 
 @dataclass
 class NodeInfo:
@@ -36,26 +43,86 @@ class GraphResolver:
     """Constroi e resolve grafos de dependencia de projetos dbt."""
 
     def __init__(self) -> None:
-        nx = _import_networkx()
-        self.graph: nx.DiGraph = nx.DiGraph()
+        self.graph: nx.DiGraph = _import_networkx().DiGraph()
         self._nodes: dict[str, NodeInfo] = {}
+        self._upstream_cache: dict[str, frozenset[str]] = {}
+        self._downstream_cache: dict[str, frozenset[str]] = {}
+        self._dirty: bool = True
+        self._version: int = 0
+        self._reversed: nx.DiGraph | None = None
+        self._sorted_nodes: tuple[str, ...] | None = None
+        self._sorted_edges: tuple[tuple[str, str], ...] | None = None
 
-    def add_node(self, node: NodeInfo) -> None:
-        """Adiciona um no ao grafo."""
-        self.graph.add_node(node.name, **{
+    @staticmethod
+    def _node_attrs(node: NodeInfo) -> dict[str, Any]:
+        return {
             "node_type": node.node_type,
             "filepath": node.filepath,
             "config": node.config,
             "tags": node.tags,
-        })
+        }
+
+    def add_node(self, node: NodeInfo) -> None:
+        """Adiciona um no ao grafo."""
+        self.graph.add_node(node.name, **self._node_attrs(node))
         self._nodes[node.name] = node
+        self._mark_changed()
         logger.debug("No adicionado: %s (%s)", node.name, node.node_type)
 
     def add_edge(self, from_node: str, to_node: str) -> None:
         """Adiciona aresta de dependencia (from depende de to)."""
         self.graph.add_edge(from_node, to_node)
+        self._mark_changed()
         logger.debug("Aresta adicionada: %s -> %s", from_node, to_node)
 
+    def add_nodes(self, nodes: Iterable[NodeInfo]) -> None:
+        """Adiciona varios nos ao grafo numa unica chamada ao networkx."""
+        batch = {node.name: node for node in nodes}
+        self.graph.add_nodes_from(
+            (name, self._node_attrs(node)) for name, node in batch.items()
+        )
+        self._nodes.update(batch)
+        self._mark_changed()
+        logger.debug("Nos adicionados em lote: %d", len(batch))
+
+    def add_edges(self, edges: Iterable[tuple[str, str]]) -> None:
+        """Adiciona varias arestas (from depende de to) numa unica chamada."""
+        self.graph.add_edges_from(edges)
+        self._mark_changed()
+
+    def _mark_changed(self) -> None:
+        """Invalida caches derivados apos qualquer alteracao no grafo."""
+        self._dirty = True
+        self._sorted_nodes = None
+        self._sorted_edges = None
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        """Contador incrementado a cada alteracao no grafo."""
+        return self._version
+
+    def sorted_nodes(self) -> tuple[str, ...]:
+        """Nos em ordem alfabetica, ordenados uma vez por versao do grafo."""
+        if self._sorted_nodes is None:
+            self._sorted_nodes = tuple(sorted(self.graph.nodes()))
+        return self._sorted_nodes
+
+    def sorted_edges(self) -> tuple[tuple[str, str], ...]:
+        """Arestas em ordem alfabetica, ordenadas uma vez por versao do grafo."""
+        if self._sorted_edges is None:
+            self._sorted_edges = tuple(sorted(self.graph.edges()))
+        return self._sorted_edges
+
+    def reversed_view(self) -> nx.DiGraph:
+        """Retorna visao reversa do grafo (sem copia), criada uma unica vez.
+
+        Por ser uma visao, reflete automaticamente alteracoes posteriores.
+        """
+        if self._reversed is None:
+            self._reversed = self.graph.reverse(copy=False)
+        return self._reversed
+
     def get_dependencies(self, node_name: str) -> set[str]:
         """Retorna dependencias diretas de um no."""
         if node_name not in self.graph:
@@ -68,34 +135,96 @@ class GraphResolver:
             return set()
         return set(self.graph.predecessors(node_name))
 
-    def get_all_upstream(self, node_name: str) -> set[str]:
+    def get_all_upstream(self, node_name: str) -> frozenset[str]:
         """Retorna todas as dependencias transitivas (upstream)."""
-        nx = _import_networkx()
-        if node_name not in self.graph:
-            return set()
-        return set(nx.descendants(self.graph, node_name))
+        if self._dirty:
+            self._build_closure()
+        return self._upstream_cache.get(node_name, frozenset())
 
-    def get_all_downstream(self, node_name: str) -> set[str]:
+    def get_all_downstream(self, node_name: str) -> frozenset[str]:
         """Retorna todos os dependentes transitivos (downstream)."""
-        nx = _import_networkx()
+        if self._dirty:
+            self._build_closure()
+        return self._downstream_cache.get(node_name, frozenset())
+
+    def shortest_path_lengths(
+        self, node_name: str, reverse: bool = False, cutoff: int | None = None
+    ) -> dict[str, int]:
+        """Distancia de node_name ate cada no alcancavel (dependencias ou dependentes)."""
         if node_name not in self.graph:
-            return set()
-        return set(nx.ancestors(self.graph, node_name))
+            return {}
+        graph = self.reversed_view() if reverse else self.graph
+        return nx.single_source_shortest_path_length(graph, node_name, cutoff=cutoff)
+
+    def upstream_count(self, node_name: str) -> int:
+        """Retorna numero de dependencias transitivas sem copiar o conjunto."""
+        return len(self.get_all_upstream(node_name))
+
+    def downstream_count(self, node_name: str) -> int:
+        """Retorna numero de dependentes transitivos sem copiar o conjunto."""
+        return len(self.get_all_downstream(node_name))
+
+    def _build_closure(self) -> None:
+        """Calcula o fecho transitivo de todos os nos em uma unica passada.
+
+        O grafo e condensado em componentes fortemente conexos para que ciclos
+        nao impecam a ordenacao topologica. O fecho de cada componente e a
+        uniao dos fechos dos seus vizinhos, calculada em ordem topologica.
+        """
+        condensed = _condensation(self.graph)
+        order = list(_topological_sort(condensed))
+        members: dict[int, frozenset[str]] = {
+            comp: frozenset(data["members"]) for comp, data in condensed.nodes(data=True)
+        }
+
+        up: dict[int, frozenset[str]] = {}
+        for comp in reversed(order):
+            reach: set[str] = set()
+            for succ in condensed.successors(comp):
+                reach.update(members[succ])
+                reach.update(up[succ])
+            up[comp] = frozenset(reach)
+
+        down: dict[int, frozenset[str]] = {}
+        for comp in order:
+            reach = set()
+            for pred in condensed.predecessors(comp):
+                reach.update(members[pred])
+                reach.update(down[pred])
+            down[comp] = frozenset(reach)
+
+        self._upstream_cache = self._expand_closure(members, up)
+        self._downstream_cache = self._expand_closure(members, down)
+        self._dirty = False
+        logger.debug("Fecho transitivo calculado: %d nos", len(self._upstream_cache))
+
+    @staticmethod
+    def _expand_closure(
+        members: dict[int, frozenset[str]], closure: dict[int, frozenset[str]]
+    ) -> dict[str, frozenset[str]]:
+        """Distribui o fecho de cada componente para os seus nos."""
+        cache: dict[str, frozenset[str]] = {}
+        for comp, comp_members in members.items():
+            if len(comp_members) == 1:
+                for name in comp_members:
+                    cache[name] = closure[comp]
+                continue
+            for name in comp_members:
+                cache[name] = closure[comp] | (comp_members - {name})
+        return cache
 
     def topological_sort(self) -> list[str]:
         """Retorna ordem topologica de execucao."""
-        nx = _import_networkx()
         try:
-            return list(reversed(list(nx.topological_sort(self.graph))))
+            return list(reversed(list(_topological_sort(self.graph))))
         except nx.NetworkXUnfeasible:
             logger.error("Ciclo detectado no grafo de dependencias")
             raise ValueError("Ciclo detectado no grafo de dependencias")
 
     def detect_cycles(self) -> list[list[str]]:
         """Detecta ciclos no grafo."""
-        nx = _import_networkx()
         try:
-            cycles = list(nx.simple_cycles(self.graph))
+            cycles = list(_simple_cycles(self.graph))
             if cycles:
                 logger.warning("Ciclos detectados: %d", len(cycles))
             return cycles
@@ -2,6 +2,7 @@
 
 import logging
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import Any
 
 from dbt_parser.analyzers.graph_resolver import GraphResolver
@@ -37,9 +38,12 @@ class ImpactAnalyzer:
         transitively_affected = sorted(self.graph.get_all_downstream(model_name))
 
         affected_by_type: dict[str, int] = {}
+        nodes = self.graph.graph.nodes
         for affected in transitively_affected:
-            node_data = dict(self.graph.graph.nodes.get(affected, {}))
-            node_type = node_data.get("node_type", "unknown")
+            try:
+                node_type = nodes[affected]["node_type"]
+            except KeyError:
+                node_type = "unknown"
             affected_by_type[node_type] = affected_by_type.get(node_type, 0) + 1
 
         total = len(transitively_affected)
@@ -80,12 +84,16 @@ class ImpactAnalyzer:
 
     def find_high_impact_models(self, threshold: int = 5) -> list[tuple[str, int]]:
         """Encontra modelos com alto impacto (muitos dependentes)."""
-        results: list[tuple[str, int]] = []
-        for node in self.graph.graph.nodes():
-            downstream_count = len(self.graph.get_all_downstream(node))
-            if downstream_count >= threshold:
-                results.append((node, downstream_count))
-        return sorted(results, key=lambda x: x[1], reverse=True)
+        results = [
+            (node, count)
+            for node, count in self._downstream_sizes().items()
+            if count >= threshold
+        ]
+        return sorted(results, key=itemgetter(1), reverse=True)
+
+    def _downstream_sizes(self) -> dict[str, int]:
+        """Retorna numero de dependentes transitivos de cada no do grafo."""
+        return {node: self.graph.downstream_count(node) for node in self.graph.graph}
 
     def get_critical_path(self) -> list[str]:
         """Identifica caminho critico (caminho mais longo no grafo)."""
@@ -112,12 +120,7 @@ class ImpactAnalyzer:
 
     def get_impact_summary(self) -> dict[str, Any]:
         """Retorna resumo de impacto do projeto."""
-        impacts: list[tuple[str, int]] = []
-        for node in self.graph.graph.nodes():
-            count = len(self.graph.get_all_downstream(node))
-            impacts.append((node, count))
-
-        impacts.sort(key=lambda x: x[1], reverse=True)
+        impacts = sorted(self._downstream_sizes().items(), key=itemgetter(1), reverse=True)
 
         return {
             "total_nodes": self.graph.node_count(),
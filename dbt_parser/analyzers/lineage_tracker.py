@@ -1,14 +1,18 @@
 """Rastreador de linhagem de dados para projetos dbt."""
 
+from array import array
 from dataclasses import dataclass, field
+from itertools import islice
 import logging
-from typing import Any
+import sys
+from typing import Any, Iterator, Sequence
 
+from dbt_parser.analyzers.csr_kernels import bfs_order, build_csr
 from dbt_parser.analyzers.graph_resolver import GraphResolver, NodeInfo
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LineageEntry:
     """Entrada de linhagem de dados."""
 
@@ -18,8 +22,12 @@ class LineageEntry:
     columns: list[str] = field(default_factory=list)
     transformation: str = ""
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "source_node", sys.intern(self.source_node))
+        object.__setattr__(self, "target_node", sys.intern(self.target_node))
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class ColumnLineageEntry:
     """Rastreamento de linhagem em nivel de coluna."""
 
@@ -30,6 +38,43 @@ class ColumnLineageEntry:
     transformation_type: str = "direct"
     expression: str = ""
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "model", sys.intern(self.model))
+        object.__setattr__(self, "column", sys.intern(self.column))
+        object.__setattr__(self, "source_model", sys.intern(self.source_model))
+
+
+ColumnRef = tuple[str, str]
+
+@dataclass(slots=True)
+class _ColumnNode:
+    """Fontes e transformacoes registradas para uma coluna."""
+
+    sources: list[ColumnRef] = field(default_factory=list)
+    transformations: list[dict[str, str]] = field(default_factory=list)
+
+def _parse_ref(ref: str) -> ColumnRef:
+    """Converte ``modelo.coluna`` em (modelo, coluna); sem ponto, coluna vazia."""
+    model, _, column = ref.partition(".")
+    return sys.intern(model), sys.intern(column)
+
+def _format_ref(ref: ColumnRef) -> str:
+    model, column = ref
+    return f"{model}.{column}" if column else model
+
+@dataclass
+class _ColumnCsr:
+    """Snapshot CSR da linhagem de colunas com ids inteiros.
+
+    ``up`` liga cada coluna as suas fontes e ``down`` aos seus dependentes.
+    """
+
+    id_of: dict[ColumnRef, int]
+    name_of: list[ColumnRef]
+    up_indptr: array
+    up_indices: array
+    down_indptr: array
+    down_indices: array
 
 class LineageTracker:
     """Rastreia linhagem de dados atraves do projeto dbt."""
@@ -38,7 +83,17 @@ class LineageTracker:
         """Inicializa o rastreador com o resolvedor de grafos."""
         self.graph_resolver = graph_resolver
         self._lineage_entries: list[LineageEntry] = []
-        self._column_lineage: dict[str, dict[str, list[str]]] = {}
+        self._type_counts: dict[str, int] = {"ref": 0, "source": 0, "macro": 0}
+        self._index_by_model: dict[str, list[LineageEntry]] = {}
+        self._entries_view: tuple[LineageEntry, ...] | None = None
+        self._column_lineage: dict[ColumnRef, _ColumnNode] = {}
+        self._columns_by_model: dict[str, list[str]] = {}
+        self._reverse_col_index: dict[ColumnRef, list[ColumnRef]] = {}
+        self._upstream_cache: dict[ColumnRef, list[str]] = {}
+        self._downstream_cache: dict[ColumnRef, list[str]] = {}
+        self._column_csr: _ColumnCsr | None = None
+        self._depth_cache: dict[tuple[str, str], int] = {}
+        self._depth_version = -1
 
     def track_ref_lineage(
         self, model_name: str, referenced_model: str, columns: list[str | None] = None
@@ -50,8 +105,8 @@ class LineageTracker:
             lineage_type="ref",
             columns=columns or [],
         )
-        self._lineage_entries.append(entry)
-        logger.info("Linhagem ref: %s -> %s", referenced_model, model_name)
+        self._add_entry(entry)
+        logger.debug("Linhagem ref: %s -> %s", referenced_model, model_name)
         return entry
 
     def track_source_lineage(
@@ -69,10 +124,19 @@ class LineageTracker:
             lineage_type="source",
             columns=columns or [],
         )
-        self._lineage_entries.append(entry)
-        logger.info("Linhagem source: %s -> %s", source_key, model_name)
+        self._add_entry(entry)
+        logger.debug("Linhagem source: %s -> %s", source_key, model_name)
         return entry
 
+    def _add_entry(self, entry: LineageEntry) -> None:
+        """Registra a entrada mantendo contadores por tipo e indice por modelo."""
+        self._lineage_entries.append(entry)
+        self._entries_view = None
+        self._type_counts[entry.lineage_type] = self._type_counts.get(entry.lineage_type, 0) + 1
+        self._index_by_model.setdefault(entry.source_node, []).append(entry)
+        if entry.target_node != entry.source_node:
+            self._index_by_model.setdefault(entry.target_node, []).append(entry)
+
     def get_full_lineage(self, model_name: str) -> dict[str, Any]:
         """Retorna linhagem completa de um modelo (upstream e downstream)."""
         upstream = self.graph_resolver.get_all_upstream(model_name)
@@ -92,66 +156,144 @@ class LineageTracker:
         }
 
     def get_lineage_entries(
-        self, model_name: str | None = None
-    ) -> list[LineageEntry]:
-        """Retorna entradas de linhagem, opcionalmente filtradas por modelo."""
-        if model_name is None:
+        self, model_name: str | None = None, copy: bool = True
+    ) -> Sequence[LineageEntry]:
+        """Retorna entradas de linhagem, opcionalmente filtradas por modelo.
+
+        Com copy=False retorna uma tupla somente leitura; sem filtro ela e
+        reaproveitada entre chamadas ate a proxima entrada registrada.
+        """
+        if model_name is not None:
+            entries = self._index_by_model.get(model_name, [])
+            return list(entries) if copy else tuple(entries)
+        if copy:
             return self._lineage_entries.copy()
-        return [
-            e
-            for e in self._lineage_entries
-            if e.source_node == model_name or e.target_node == model_name
-        ]
-
-    def get_data_flow_path(self, source: str, target: str) -> list[list[str]]:
-        """Encontra caminhos de fluxo de dados entre dois nos."""
-        import networkx as nx
-
-        try:
-            paths = list(
-                nx.all_simple_paths(self.graph_resolver.graph, target, source)
-            )
-            return paths
-        except nx.NetworkXError:
+        if self._entries_view is None:
+            self._entries_view = tuple(self._lineage_entries)
+        return self._entries_view
+
+    def get_data_flow_path(
+        self,
+        source: str,
+        target: str,
+        cutoff: int | None = None,
+        max_paths: int | None = None,
+    ) -> list[list[str]]:
+        """Encontra caminhos de fluxo de dados entre dois nos.
+
+        Uma BFS a partir de cada ponta restringe a enumeracao aos nos que
+        estao em algum caminho de no maximo cutoff arestas, entao ramos que
+        nunca chegam a source nao sao explorados. Com max_paths a enumeracao
+        para apos esse numero de caminhos (padrao None: todos).
+        """
+        graph = self.graph_resolver.graph
+        if source not in graph or target not in graph:
             logger.warning("Caminho nao encontrado: %s -> %s", source, target)
             return []
+        if source == target:
+            return [[source]]
+
+        # Arestas apontam do dependente para a dependencia: o fluxo vai de
+        # target ate source no grafo.
+        forward = self.graph_resolver.shortest_path_lengths(target, cutoff=cutoff)
+        backward = self.graph_resolver.shortest_path_lengths(source, reverse=True, cutoff=cutoff)
+        limit = cutoff if cutoff is not None else len(graph)
+        remaining = {
+            node: dist
+            for node, dist in backward.items()
+            if node in forward and forward[node] + dist <= limit
+        }
+        if target not in remaining:
+            return []
+
+        paths = self._iter_flow_paths(graph._adj, source, target, remaining, limit)
+        result = list(islice(paths, max_paths))
+        if max_paths is not None and len(result) == max_paths and next(paths, None) is not None:
+            logger.warning(
+                "Caminhos %s -> %s truncados em max_paths=%d", source, target, max_paths
+            )
+        return result
+
+    @staticmethod
+    def _iter_flow_paths(
+        adj: dict[str, dict[str, Any]],
+        source: str,
+        target: str,
+        remaining: dict[str, int],
+        limit: int,
+    ) -> Iterator[list[str]]:
+        """Gera caminhos simples de target ate source, um por vez.
+
+        remaining[n] e a distancia minima de n ate source; ramos que
+        estourariam limit sao podados antes de serem empilhados.
+        """
+        path = [target]
+        on_path = {target}
+        stack = [iter(adj[target])]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if node in on_path or node not in remaining:
+                continue
+            if len(path) + remaining[node] > limit:
+                continue
+            if node == source:
+                yield path + [node]
+                continue
+            path.append(node)
+            on_path.add(node)
+            stack.append(iter(adj[node]))
 
     def track_column_lineage(
         self, model_name: str, column_name: str, source_columns: list[str]
     ) -> None:
-        """Registra linhagem em nivel de coluna."""
-        if model_name not in self._column_lineage:
-            self._column_lineage[model_name] = {}
-        self._column_lineage[model_name][column_name] = source_columns
+        """Registra linhagem em nivel de coluna (substitui fontes anteriores).
+
+        source_columns usa o formato ``modelo.coluna``.
+        """
+        key = (sys.intern(model_name), sys.intern(column_name))
+        node = self._column_node(key)
+        self._unlink_sources(key, node.sources)
+        node.sources = [_parse_ref(ref) for ref in source_columns]
+        self._link_sources(key, node.sources)
+        self._invalidate_column_caches()
 
     def get_column_lineage(self, model_name: str) -> dict[str, list[str]]:
         """Retorna linhagem de colunas de um modelo."""
-        return self._column_lineage.get(model_name, {})
+        return {
+            column: [_format_ref(ref) for ref in self._column_lineage[(model_name, column)].sources]
+            for column in self._columns_by_model.get(model_name, [])
+        }
 
     def _calculate_depth(self, node_name: str, direction: str = "up") -> int:
-        """Calcula profundidade maxima de linhagem."""
-        import networkx as nx
-
-        if node_name not in self.graph_resolver.graph:
-            return 0
-
-        if direction == "up":
-            lengths = nx.single_source_shortest_path_length(
-                self.graph_resolver.graph, node_name
-            )
-        else:
-            reversed_graph = self.graph_resolver.graph.reverse()
-            lengths = nx.single_source_shortest_path_length(reversed_graph, node_name)
+        """Calcula profundidade maxima de linhagem (memoizada por versao do grafo)."""
+        if self._depth_version != self.graph_resolver.version:
+            self._depth_cache.clear()
+            self._depth_version = self.graph_resolver.version
+
+        cache_key = (node_name, direction)
+        depth = self._depth_cache.get(cache_key)
+        if depth is not None:
+            return depth
+
+        lengths = self.graph_resolver.shortest_path_lengths(
+            node_name, reverse=direction != "up"
+        )
+        depth = max(lengths.values()) if lengths else 0
 
-        return max(lengths.values()) if lengths else 0
+        self._depth_cache[cache_key] = depth
+        return depth
 
     def get_lineage_summary(self) -> dict[str, Any]:
         """Retorna resumo da linhagem do projeto."""
         return {
             "total_entries": len(self._lineage_entries),
-            "ref_entries": sum(1 for e in self._lineage_entries if e.lineage_type == "ref"),
-            "source_entries": sum(1 for e in self._lineage_entries if e.lineage_type == "source"),
-            "models_with_column_lineage": len(self._column_lineage),
+            "ref_entries": self._type_counts["ref"],
+            "source_entries": self._type_counts["source"],
+            "models_with_column_lineage": len(self._columns_by_model),
         }
 
     def track_column_transformation(
@@ -164,24 +306,15 @@ class LineageTracker:
         expression: str = "",
     ) -> None:
         """Rastreia transformacao em nivel de coluna entre modelos."""
-        entry = ColumnLineageEntry(
-            model=model,
-            column=column,
-            source_model=source_model,
-            source_columns=source_columns,
-            transformation_type=transformation_type,
-            expression=expression,
-        )
-        key = f"{model}.{column}"
-        if key not in self._column_lineage:
-            self._column_lineage[key] = {"sources": [], "transformations": []}
-        self._column_lineage[key]["sources"].extend(
-            [f"{source_model}.{sc}" for sc in source_columns]
-        )
+        key = (sys.intern(model), sys.intern(column))
+        node = self._column_node(key)
+        source_model = sys.intern(source_model)
+        new_sources = [(source_model, sys.intern(sc)) for sc in source_columns]
+        node.sources.extend(new_sources)
+        self._link_sources(key, new_sources)
         if transformation_type != "direct":
-            self._column_lineage[key]["transformations"].append(
-                {"type": transformation_type, "expression": expression}
-            )
+            node.transformations.append({"type": transformation_type, "expression": expression})
+        self._invalidate_column_caches()
         logger.debug(
             "Column lineage: %s.%s <- %s.%s (%s)",
             model,
@@ -193,45 +326,101 @@ class LineageTracker:
 
     def get_column_upstream(self, model: str, column: str) -> list[str]:
         """Retorna todas as colunas upstream de uma coluna especifica."""
-        key = f"{model}.{column}"
-        entry = self._column_lineage.get(key, {})
-        sources = entry.get("sources", [])
-        all_upstream = list(sources)
-        for source_ref in sources:
-            parts = source_ref.split(".", 1)
-            if len(parts) == 2:
-                upstream = self.get_column_upstream(parts[0], parts[1])
-                all_upstream.extend(upstream)
-        return list(dict.fromkeys(all_upstream))
+        key = (model, column)
+        upstream = self._upstream_cache.get(key)
+        if upstream is None:
+            upstream = self._walk_columns(key, downstream=False)
+            self._upstream_cache[key] = upstream
+        return list(upstream)
 
     def get_column_downstream(self, model: str, column: str) -> list[str]:
         """Retorna todas as colunas downstream de uma coluna especifica."""
-        source_ref = f"{model}.{column}"
-        downstream: list[str] = []
-        for key, entry in self._column_lineage.items():
-            if source_ref in entry.get("sources", []):
-                downstream.append(key)
-                parts = key.split(".", 1)
-                if len(parts) == 2:
-                    child_downstream = self.get_column_downstream(parts[0], parts[1])
-                    downstream.extend(child_downstream)
-        return list(dict.fromkeys(downstream))
+        key = (model, column)
+        downstream = self._downstream_cache.get(key)
+        if downstream is None:
+            downstream = self._walk_columns(key, downstream=True)
+            self._downstream_cache[key] = downstream
+        return list(downstream)
+
+    def _column_node(self, key: ColumnRef) -> _ColumnNode:
+        node = self._column_lineage.get(key)
+        if node is None:
+            node = self._column_lineage[key] = _ColumnNode()
+            self._columns_by_model.setdefault(key[0], []).append(key[1])
+        return node
+
+    def _link_sources(self, key: ColumnRef, sources: list[ColumnRef]) -> None:
+        for source_ref in sources:
+            dependents = self._reverse_col_index.setdefault(source_ref, [])
+            if key not in dependents:
+                dependents.append(key)
+
+    def _unlink_sources(self, key: ColumnRef, sources: list[ColumnRef]) -> None:
+        for source_ref in sources:
+            dependents = self._reverse_col_index.get(source_ref)
+            if dependents and key in dependents:
+                dependents.remove(key)
+
+    def _freeze(self) -> _ColumnCsr:
+        """Codifica a linhagem de colunas em ids inteiros e arrays CSR."""
+        id_of: dict[ColumnRef, int] = {}
+        for key, node in self._column_lineage.items():
+            id_of.setdefault(key, len(id_of))
+            for ref in node.sources:
+                id_of.setdefault(ref, len(id_of))
+        empty = _ColumnNode()
+        up_indptr, up_indices = build_csr(
+            id_of, {ref: self._column_lineage.get(ref, empty).sources for ref in id_of}
+        )
+        down_indptr, down_indices = build_csr(
+            id_of, {ref: self._reverse_col_index.get(ref, []) for ref in id_of}
+        )
+        return _ColumnCsr(
+            id_of=id_of,
+            name_of=list(id_of),
+            up_indptr=up_indptr,
+            up_indices=up_indices,
+            down_indptr=down_indptr,
+            down_indices=down_indices,
+        )
+
+    def _column_csr_snapshot(self) -> _ColumnCsr:
+        if self._column_csr is None:
+            self._column_csr = self._freeze()
+        return self._column_csr
+
+    def _walk_columns(self, start: ColumnRef, downstream: bool) -> list[str]:
+        """Percorre colunas em largura a partir de start sobre o snapshot CSR."""
+        csr = self._column_csr_snapshot()
+        start_id = csr.id_of.get(start)
+        if start_id is None:
+            return []
+        if downstream:
+            ids = bfs_order(csr.down_indptr, csr.down_indices, start_id)
+        else:
+            ids = bfs_order(csr.up_indptr, csr.up_indices, start_id)
+        name_of = csr.name_of
+        return [_format_ref(name_of[i]) for i in ids]
+
+    def _invalidate_column_caches(self) -> None:
+        self._upstream_cache.clear()
+        self._downstream_cache.clear()
+        self._column_csr = None
 
     def get_column_lineage_graph(self) -> dict[str, dict[str, Any]]:
-        """Retorna o grafo completo de linhagem em nivel de coluna."""
+        """Retorna o grafo completo de linhagem em nivel de coluna.
+
+        Os downstream de cada coluna vem de uma BFS sobre o snapshot CSR,
+        compartilhado por todas as colunas e com memoria linear no grafo.
+        """
         graph: dict[str, dict[str, Any]] = {}
-        for key, entry in self._column_lineage.items():
-            graph[key] = {
-                "upstream": entry.get("sources", []),
-                "transformations": entry.get("transformations", []),
-                "downstream": self.get_column_downstream(
-                    *key.split(".", 1)
-                )
-                if "." in key
-                else [],
+        for key, node in self._column_lineage.items():
+            graph[_format_ref(key)] = {
+                "upstream": [_format_ref(ref) for ref in node.sources],
+                "transformations": node.transformations,
+                "downstream": self.get_column_downstream(*key),
             }
         return graph
 
-
 # "O impedimento a acao avanca a acao. O que esta no caminho se torna o caminho." -- Marco Aurelio
 
@@ -1,16 +1,19 @@
 """Resolver de referencias ref() e source() para projetos dbt."""
 
 import logging
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
 
 from dbt_parser.parsers.sql_parser import SqlParser
 from dbt_parser.parsers.schema_extractor import SchemaExtractor
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+UNRESOLVED_LOG_LIMIT = 10
+
+@dataclass(slots=True, frozen=True)
 class ResolvedRef:
     """Referencia resolvida."""
 
@@ -20,6 +23,10 @@ class ResolvedRef:
     resolved: bool = True
     resolution_path: str | None = None
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "source_model", sys.intern(self.source_model))
+        object.__setattr__(self, "target_model", sys.intern(self.target_model))
+
 class RefResolver:
     """Resolve referencias entre modelos dbt."""
 
@@ -30,21 +37,39 @@ class RefResolver:
         self.schema_extractor = schema_extractor
         self._resolved_refs: list[ResolvedRef] = []
         self._unresolved_refs: list[ResolvedRef] = []
+        self._resolved_view: tuple[ResolvedRef, ...] | None = None
+        self._unresolved_view: tuple[ResolvedRef, ...] | None = None
+        self._known_sets: tuple[frozenset[str], frozenset[tuple[str, str]]] | None = None
+        self._known_key: tuple[int, int] | None = None
+
+    def _build_known_sets(self) -> tuple[frozenset[str], frozenset[tuple[str, str]]]:
+        """Retorna (modelos conhecidos, pares (source, tabela) conhecidos).
+
+        Os conjuntos sao reconstruidos apenas quando o parser SQL ou o
+        extrator de schema registram novos dados.
+        """
+        key = (self.sql_parser.version, self.schema_extractor.version)
+        if self._known_sets is None or self._known_key != key:
+            known_models = frozenset(self.sql_parser._parsed_models).union(
+                m.name for m in self.schema_extractor.get_all_models()
+            )
+            known_sources = frozenset(
+                (source.name, table.get("name", "") if isinstance(table, dict) else str(table))
+                for source in self.schema_extractor.get_all_sources()
+                for table in source.tables
+            )
+            self._known_sets = (known_models, known_sources)
+            self._known_key = key
+        return self._known_sets
 
     def resolve_all(self) -> tuple[list[ResolvedRef], list[ResolvedRef]]:
         """Resolve todas as referencias do projeto."""
         self._resolved_refs.clear()
         self._unresolved_refs.clear()
+        self._resolved_view = None
+        self._unresolved_view = None
 
-        known_models = set(self.sql_parser._parsed_models.keys())
-        schema_models = {m.name for m in self.schema_extractor.get_all_models()}
-        all_known = known_models | schema_models
-
-        known_sources: set[str] = set()
-        for source in self.schema_extractor.get_all_sources():
-            for table in source.tables:
-                table_name = table.get("name", "") if isinstance(table, dict) else str(table)
-                known_sources.add(f"{source.name}.{table_name}")
+        all_known, known_sources = self._build_known_sets()
 
         for model_name, refs in self.sql_parser.get_all_refs().items():
             for ref in refs:
@@ -66,14 +91,11 @@ class RefResolver:
                             resolved=False,
                         )
                     )
-                    logger.warning(
-                        "Ref nao resolvida: %s referencia '%s'", model_name, ref
-                    )
 
         for model_name, sources in self.sql_parser.get_all_sources().items():
             for source_name, table_name in sources:
                 source_key = f"{source_name}.{table_name}"
-                if source_key in known_sources:
+                if (source_name, table_name) in known_sources:
                     self._resolved_refs.append(
                         ResolvedRef(
                             source_model=model_name,
@@ -91,12 +113,17 @@ class RefResolver:
                             resolved=False,
                         )
                     )
-                    logger.warning(
-                        "Source nao resolvido: %s referencia '%s'",
-                        model_name,
-                        source_key,
-                    )
 
+        if self._unresolved_refs and logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Referencias nao resolvidas: %d; primeiras %d: %s",
+                len(self._unresolved_refs),
+                min(len(self._unresolved_refs), UNRESOLVED_LOG_LIMIT),
+                ", ".join(
+                    f"{r.source_model} -> '{r.target_model}'"
+                    for r in self._unresolved_refs[:UNRESOLVED_LOG_LIMIT]
+                ),
+            )
         logger.info(
             "Resolucao concluida: %d resolvidas, %d nao resolvidas",
             len(self._resolved_refs),
@@ -104,13 +131,21 @@ class RefResolver:
         )
         return self._resolved_refs.copy(), self._unresolved_refs.copy()
 
-    def get_resolved(self) -> list[ResolvedRef]:
-        """Retorna referencias resolvidas."""
-        return self._resolved_refs.copy()
-
-    def get_unresolved(self) -> list[ResolvedRef]:
-        """Retorna referencias nao resolvidas."""
-        return self._unresolved_refs.copy()
+    def get_resolved(self, copy: bool = True) -> Sequence[ResolvedRef]:
+        """Retorna referencias resolvidas (tupla somente leitura com copy=False)."""
+        if copy:
+            return self._resolved_refs.copy()
+        if self._resolved_view is None:
+            self._resolved_view = tuple(self._resolved_refs)
+        return self._resolved_view
+
+    def get_unresolved(self, copy: bool = True) -> Sequence[ResolvedRef]:
+        """Retorna referencias nao resolvidas (tupla somente leitura com copy=False)."""
+        if copy:
+            return self._unresolved_refs.copy()
+        if self._unresolved_view is None:
+            self._unresolved_view = tuple(self._unresolved_refs)
+        return self._unresolved_view
 
     def get_resolution_summary(self) -> dict[str, Any]:
         """Retorna resumo da resolucao."""
@@ -2,13 +2,13 @@
 
 import logging
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterable
 
 from dbt_parser.analyzers.graph_resolver import GraphResolver
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class UnusedReport:
     """Relatorio de modelos nao utilizados."""
 
@@ -24,15 +24,15 @@ class UnusedDetector:
     def __init__(self, graph: GraphResolver) -> None:
         self.graph = graph
 
-    def detect_unused_models(self, exposure_models: set[str | None] = None) -> list[str]:
+    def detect_unused_models(self, exposure_models: Iterable[str] | None = None) -> list[str]:
         """Detecta modelos sem nenhum dependente (nao expostos)."""
         leaf_nodes = self.graph.get_leaf_nodes()
-        exposures = exposure_models or set()
+        exposures = frozenset(exposure_models) if exposure_models else frozenset()
 
+        nodes = self.graph.graph.nodes
         unused: list[str] = []
         for node in leaf_nodes:
-            node_data = dict(self.graph.graph.nodes.get(node, {}))
-            if node_data.get("node_type") == "model" and node not in exposures:
+            if nodes[node].get("node_type") == "model" and node not in exposures:
                 unused.append(node)
 
         if unused:
@@ -42,13 +42,11 @@ class UnusedDetector:
 
     def detect_orphan_sources(self) -> list[str]:
         """Detecta sources declarados mas nao referenciados por nenhum modelo."""
+        graph = self.graph.graph
         orphans: list[str] = []
-        for node in self.graph.graph.nodes():
-            node_data = dict(self.graph.graph.nodes.get(node, {}))
-            if node_data.get("node_type") == "source":
-                dependents = self.graph.get_dependents(node)
-                if not dependents:
-                    orphans.append(node)
+        for node, node_data in graph.nodes(data=True):
+            if node_data.get("node_type") == "source" and graph.in_degree(node) == 0:
+                orphans.append(node)
 
         if orphans:
             logger.warning("Sources orfaos detectados: %d", len(orphans))
@@ -57,14 +55,13 @@ class UnusedDetector:
 
     def detect_dead_end_models(self) -> list[str]:
         """Detecta modelos que nao sao referenciados e nao sao folhas finais."""
+        graph = self.graph.graph
         dead_ends: list[str] = []
-        for node in self.graph.graph.nodes():
-            node_data = dict(self.graph.graph.nodes.get(node, {}))
-            if node_data.get("node_type") == "model":
-                dependents = self.graph.get_dependents(node)
-                dependencies = self.graph.get_dependencies(node)
-                if not dependents and dependencies:
-                    dead_ends.append(node)
+        for node, node_data in graph.nodes(data=True):
+            if node_data.get("node_type") != "model":
+                continue
+            if graph.in_degree(node) == 0 and graph.out_degree(node) > 0:
+                dead_ends.append(node)
         return sorted(dead_ends)
 
     def detect_isolated_nodes(self) -> list[str]:
@@ -78,20 +75,53 @@ class UnusedDetector:
                 isolated.append(node)
         return sorted(isolated)
 
+    def _classify_nodes(
+        self, exposures: frozenset[str]
+    ) -> tuple[list[str], list[str], list[str]]:
+        """Classifica todos os nos numa unica passada.
+
+        Retorna (modelos nao utilizados, sources orfaos, modelos dead end),
+        com os mesmos criterios dos metodos detect_* individuais.
+        """
+        graph = self.graph.graph
+        in_degree = graph.in_degree
+        out_degree = graph.out_degree
+        unused: list[str] = []
+        orphans: list[str] = []
+        dead_ends: list[str] = []
+        for node, node_data in graph.nodes(data=True):
+            if in_degree(node) != 0:
+                continue
+            node_type = node_data.get("node_type")
+            if node_type == "model":
+                if node not in exposures:
+                    unused.append(node)
+                if out_degree(node) > 0:
+                    dead_ends.append(node)
+            elif node_type == "source":
+                orphans.append(node)
+
+        if unused:
+            logger.warning("Modelos nao utilizados detectados: %d", len(unused))
+        if orphans:
+            logger.warning("Sources orfaos detectados: %d", len(orphans))
+        return sorted(unused), sorted(orphans), sorted(dead_ends)
+
     def generate_report(
         self,
-        exposure_models: set[str | None] = None,
-        known_macros: set[str | None] = None,
-        used_macros: set[str | None] = None,
+        exposure_models: Iterable[str] | None = None,
+        known_macros: Iterable[str] | None = None,
+        used_macros: Iterable[str] | None = None,
     ) -> UnusedReport:
         """Gera relatorio completo de artefatos nao utilizados."""
-        unused_models = self.detect_unused_models(exposure_models)
-        orphan_sources = self.detect_orphan_sources()
-        dead_ends = self.detect_dead_end_models()
+        exposures = frozenset(exposure_models) if exposure_models else frozenset()
+        unused_models, orphan_sources, dead_ends = self._classify_nodes(exposures)
 
+        known = frozenset(known_macros) if known_macros else frozenset()
+        used = frozenset(used_macros) if used_macros else frozenset()
         unused_macro_list: list[str] = []
-        if known_macros and used_macros:
-            unused_macro_list = sorted(known_macros - used_macros)
+        if known and used:
+            unused_macro_list = sorted(known.difference(used))
 
         total = len(unused_models) + len(orphan_sources) + len(dead_ends) + len(unused_macro_list)
 
@@ -4,6 +4,7 @@ import argparse
 import logging
 import sys
 from pathlib import Path
+from typing import Any, Callable
 
 from dbt_parser import __version__
 
@@ -43,6 +44,26 @@ def create_parser() -> argparse.ArgumentParser:
         help="Diretorio raiz do projeto dbt (default: diretorio atual)",
     )
 
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Paralelismo opcional para projetos grandes: com N > 1, YAML e SQL em "
+            "threads e, com milhares de arquivos, SQL em N processos (default: 1, "
+            "tudo em serie)"
+        ),
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=(
+            "Reaproveita o parsing entre execucoes (cache por usuario em "
+            "$XDG_CACHE_HOME/dbt-parser, nunca dentro do projeto)"
+        ),
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -86,41 +107,128 @@ def create_parser() -> argparse.ArgumentParser:
 
     return parser
 
-def run_parse(args: argparse.Namespace) -> int:
-    """Executa comando de parsing."""
-    from dbt_parser.parsers.yaml_parser import YamlParser
-    from dbt_parser.parsers.sql_parser import SqlParser
-    from dbt_parser.parsers.schema_extractor import SchemaExtractor
+def _resolve_project_dir(args: argparse.Namespace) -> Path | None:
+    """Resolve o diretorio do projeto; loga erro e retorna None se nao existir.
 
+    Chamado antes dos imports de parsers e analyzers para que caminhos de
+    erro nao paguem o custo de importacao.
+    """
     project_dir = args.project_dir.resolve()
     if not project_dir.exists():
         logger.error("Diretorio nao encontrado: %s", project_dir)
+        return None
+    return project_dir
+
+def _parse_cache(args: argparse.Namespace, project_dir: Path) -> Any | None:
+    """Retorna o cache de parsing do projeto com --cache, senao None."""
+    if not args.cache:
+        return None
+    from dbt_parser.utils.cache import ParseCache, project_cache_dir
+
+    return ParseCache(project_cache_dir(project_dir))
+
+def _cached_parse(
+    cache: Any | None,
+    kind: str,
+    files: list[Path],
+    parse_fn: Callable[[], dict],
+    load_fn: Callable[[dict], None],
+) -> dict:
+    """Reaproveita a saida de parse_fn do cache se os arquivos nao mudaram."""
+    if cache is None:
+        return parse_fn()
+    key = cache.fingerprint(files)
+    result = cache.get(kind, key)
+    if result is not None:
+        load_fn(result)
+        return result
+    result = parse_fn()
+    try:
+        cache.put(kind, key, result)
+    except OSError as exc:
+        logger.warning("Nao foi possivel gravar cache de parsing: %s", exc)
+    return result
+
+def _parse_yaml(yaml_parser: Any, cache: Any | None, jobs: int = 1) -> dict:
+    return _cached_parse(
+        cache,
+        "yaml",
+        yaml_parser.find_yaml_files(),
+        lambda: yaml_parser.parse_all(jobs),
+        yaml_parser.load_parsed_files,
+    )
+
+def _parse_sql(sql_parser: Any, cache: Any | None, jobs: int = 1) -> dict:
+    # Se algum arquivo mudou, so ele e reparseado (cache por arquivo).
+    if cache is not None and sql_parser.file_cache is None:
+        sql_parser.file_cache = cache.file_cache("sql")
+    return _cached_parse(
+        cache,
+        "sql",
+        sql_parser.find_sql_files(),
+        lambda: sql_parser.parse_all(jobs),
+        sql_parser.load_models,
+    )
+
+def _parse_sources(
+    yaml_parser: Any, sql_parser: Any, jobs: int, cache: Any | None = None
+) -> tuple[dict, dict]:
+    """Executa o parsing YAML e SQL, em paralelo quando jobs > 1.
+
+    As arvores de arquivos e o estado de cada parser sao disjuntos, entao
+    as duas leituras (dominadas por I/O) podem rodar em threads separadas.
+    """
+    if jobs <= 1:
+        return _parse_yaml(yaml_parser, cache), _parse_sql(sql_parser, cache)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yaml_future = executor.submit(_parse_yaml, yaml_parser, cache, jobs)
+        sql_future = executor.submit(_parse_sql, sql_parser, cache, jobs)
+        return yaml_future.result(), sql_future.result()
+
+def run_parse(args: argparse.Namespace) -> int:
+    """Executa comando de parsing."""
+    project_dir = _resolve_project_dir(args)
+    if project_dir is None:
         return 1
 
+    from dbt_parser.parsers.yaml_parser import YamlParser
+    from dbt_parser.parsers.sql_parser import SqlParser
+
     yaml_parser = YamlParser(project_dir)
     sql_parser = SqlParser(project_dir)
 
-    yaml_files = yaml_parser.parse_all()
-    sql_models = sql_parser.parse_all()
-
-    print(f"Projeto: {project_dir}")
-    print(f"Arquivos YAML: {len(yaml_files)}")
-    print(f"Modelos SQL: {len(sql_models)}")
+    yaml_files, sql_models = _parse_sources(
+        yaml_parser, sql_parser, args.jobs, _parse_cache(args, project_dir)
+    )
 
-    for name, model in sql_models.items():
-        print(f"  - {name}: refs={model.refs}, sources={model.sources}")
+    out = [
+        f"Projeto: {project_dir}\n",
+        f"Arquivos YAML: {len(yaml_files)}\n",
+        f"Modelos SQL: {len(sql_models)}\n",
+    ]
+    out.extend(
+        f"  - {name}: refs={model.refs}, sources={model.sources}\n"
+        for name, model in sql_models.items()
+    )
+    sys.stdout.writelines(out)
 
     return 0
 
 def run_graph(args: argparse.Namespace) -> int:
     """Executa comando de analise de grafo."""
+    project_dir = _resolve_project_dir(args)
+    if project_dir is None:
+        return 1
+
     from dbt_parser.parsers.sql_parser import SqlParser
     from dbt_parser.analyzers.graph_resolver import GraphResolver
     from dbt_parser.analyzers.dependency_analyzer import DependencyAnalyzer
 
-    project_dir = args.project_dir.resolve()
     sql_parser = SqlParser(project_dir)
-    sql_parser.parse_all()
+    _parse_sql(sql_parser, _parse_cache(args, project_dir), args.jobs)
 
     graph = GraphResolver()
     analyzer = DependencyAnalyzer(graph, sql_parser)
@@ -128,31 +236,42 @@ def run_graph(args: argparse.Namespace) -> int:
 
     if args.model:
         report = analyzer.analyze_model(args.model)
-        print(f"Modelo: {report.model_name}")
-        print(f"  Dependencias diretas: {report.direct_dependencies}")
-        print(f"  Dependentes diretos: {report.direct_dependents}")
+        out = [
+            f"Modelo: {report.model_name}\n",
+            f"  Dependencias diretas: {report.direct_dependencies}\n",
+            f"  Dependentes diretos: {report.direct_dependents}\n",
+        ]
     else:
-        print(f"Nos: {graph.node_count()}")
-        print(f"Arestas: {graph.edge_count()}")
-        print(f"Raizes: {sorted(graph.get_root_nodes())}")
-        print(f"Folhas: {sorted(graph.get_leaf_nodes())}")
+        out = [
+            f"Nos: {graph.node_count()}\n",
+            f"Arestas: {graph.edge_count()}\n",
+            f"Raizes: {sorted(graph.get_root_nodes())}\n",
+            f"Folhas: {sorted(graph.get_leaf_nodes())}\n",
+        ]
+    sys.stdout.writelines(out)
 
     return 0
 
 def run_validate(args: argparse.Namespace) -> int:
     """Executa comando de validacao."""
+    project_dir = _resolve_project_dir(args)
+    if project_dir is None:
+        return 1
+
     from dbt_parser.parsers.yaml_parser import YamlParser
     from dbt_parser.parsers.sql_parser import SqlParser
     from dbt_parser.parsers.schema_extractor import SchemaExtractor
-    from dbt_parser.validators.model_validator import ModelValidator, Severity
+    from dbt_parser.validators.model_validator import (
+        SEVERITY_RANK,
+        ModelValidator,
+        Severity,
+    )
 
-    project_dir = args.project_dir.resolve()
     yaml_parser = YamlParser(project_dir)
     sql_parser = SqlParser(project_dir)
     extractor = SchemaExtractor(yaml_parser)
 
-    yaml_parser.parse_all()
-    sql_parser.parse_all()
+    _parse_sources(yaml_parser, sql_parser, args.jobs, _parse_cache(args, project_dir))
 
     for content in yaml_parser.get_parsed_files().values():
         if "models" in content:
@@ -161,16 +280,12 @@ def run_validate(args: argparse.Namespace) -> int:
     validator = ModelValidator(extractor, sql_parser)
     results = validator.validate_all()
 
-    severity_map = {"error": Severity.ERROR, "warning": Severity.WARNING, "info": Severity.INFO}
-    min_severity = severity_map[args.severity]
-
-    severity_order = [Severity.ERROR, Severity.WARNING, Severity.INFO]
-    max_idx = severity_order.index(min_severity)
-    allowed = set(severity_order[: max_idx + 1])
-
-    filtered = [r for r in results if r.severity in allowed]
-    for result in filtered:
-        print(f"[{result.severity.value.upper()}] {result.model_name}: {result.message}")
+    max_rank = SEVERITY_RANK[Severity(args.severity)]
+    sys.stdout.writelines(
+        f"[{result.severity.value.upper()}] {result.model_name}: {result.message}\n"
+        for result in results
+        if SEVERITY_RANK[result.severity] <= max_rank
+    )
 
     summary = validator.get_summary()
     print(f"\nResumo: {summary['errors']} erros, {summary['warnings']} avisos, {summary['info']} info")
@@ -179,14 +294,17 @@ def run_validate(args: argparse.Namespace) -> int:
 
 def run_lineage(args: argparse.Namespace) -> int:
     """Executa comando de linhagem."""
+    project_dir = _resolve_project_dir(args)
+    if project_dir is None:
+        return 1
+
     from dbt_parser.parsers.sql_parser import SqlParser
     from dbt_parser.analyzers.graph_resolver import GraphResolver
     from dbt_parser.analyzers.dependency_analyzer import DependencyAnalyzer
     from dbt_parser.analyzers.lineage_tracker import LineageTracker
 
-    project_dir = args.project_dir.resolve()
     sql_parser = SqlParser(project_dir)
-    sql_parser.parse_all()
+    _parse_sql(sql_parser, _parse_cache(args, project_dir), args.jobs)
 
     graph = GraphResolver()
     dep_analyzer = DependencyAnalyzer(graph, sql_parser)
@@ -195,11 +313,13 @@ def run_lineage(args: argparse.Namespace) -> int:
     tracker = LineageTracker(graph)
     lineage = tracker.get_full_lineage(args.model)
 
-    print(f"Linhagem de: {lineage['model']}")
-    print(f"  Upstream: {lineage['upstream']}")
-    print(f"  Downstream: {lineage['downstream']}")
-    print(f"  Profundidade upstream: {lineage['lineage_depth_up']}")
-    print(f"  Profundidade downstream: {lineage['lineage_depth_down']}")
+    sys.stdout.writelines([
+        f"Linhagem de: {lineage['model']}\n",
+        f"  Upstream: {lineage['upstream']}\n",
+        f"  Downstream: {lineage['downstream']}\n",
+        f"  Profundidade upstream: {lineage['lineage_depth_up']}\n",
+        f"  Profundidade downstream: {lineage['lineage_depth_down']}\n",
+    ])
 
     return 0
 
@@ -210,8 +330,22 @@ COMMAND_MAP = {
     "lineage": run_lineage,
 }
 
+def _sniff_argv(argv: list[str]) -> int | None:
+    """Atende ``--version`` sem montar o parser; retorna None para seguir o fluxo normal.
+
+    ``--help`` continua com o argparse para listar os subcomandos reais.
+    """
+    if argv == ["--version"]:
+        print(f"dbt-parser {__version__}")
+        return 0
+    return None
+
 def main(argv: list[str | None] = None) -> int:
     """Ponto de entrada principal da CLI."""
+    fast_exit = _sniff_argv(sys.argv[1:] if argv is None else list(argv))
+    if fast_exit is not None:
+        return fast_exit
+
     parser = create_parser()
     args = parser.parse_args(argv)
 
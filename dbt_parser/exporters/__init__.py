@@ -1,11 +1,31 @@
-"""Modulos de exportacao para diferentes formatos."""
+"""Modulos de exportacao para diferentes formatos.
 
-from dbt_parser.exporters.json_exporter import JsonExporter
-from dbt_parser.exporters.graphviz_exporter import GraphvizExporter
-from dbt_parser.exporters.mermaid_exporter import MermaidExporter
+Os exportadores sao importados sob demanda (PEP 562): importar o pacote
+nao carrega graph_resolver nem os geradores ate o primeiro acesso.
+"""
+
+import importlib
+from typing import Any
+
+_LAZY = {
+    "JsonExporter": "dbt_parser.exporters.json_exporter",
+    "GraphvizExporter": "dbt_parser.exporters.graphviz_exporter",
+    "MermaidExporter": "dbt_parser.exporters.mermaid_exporter",
+}
 
 __all__ = [
     "JsonExporter",
     "GraphvizExporter",
     "MermaidExporter",
 ]
+
+def __getattr__(name: str) -> Any:
+    module_path = _LAZY.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module(module_path), name)
+    globals()[name] = obj
+    return obj
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
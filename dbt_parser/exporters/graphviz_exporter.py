@@ -1,10 +1,13 @@
 """Exportador de grafos para formato GraphViz DOT."""
 
+import io
 import logging
+from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from dbt_parser.analyzers.graph_resolver import GraphResolver
+from dbt_parser.utils.cache import write_chunks_if_changed
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +38,21 @@ NODE_STYLES = {
     },
 }
 
+# Atributos DOT de cada estilo ja formatados, para nao refazer o join por no.
+_STYLE_ATTR_STR = {
+    node_type: " ".join(f'{k}="{v}"' for k, v in style.items())
+    for node_type, style in NODE_STYLES.items()
+}
+_HIGHLIGHT_ATTR_STR = 'penwidth="3" color="red"'
+SUBGRAPH_CACHE_SIZE = 64
+
 class GraphvizExporter:
     """Exporta grafos de dependencia para formato GraphViz DOT."""
 
     def __init__(self, graph: GraphResolver) -> None:
         self.graph = graph
+        self._subgraph_cache: dict[tuple[frozenset[str], str], str] = {}
+        self._subgraph_version = -1
 
     def to_dot(
         self,
@@ -48,89 +61,96 @@ class GraphvizExporter:
         rankdir: str = "LR",
     ) -> str:
         """Gera representacao DOT do grafo."""
-        lines: list[str] = []
-        lines.append(f'digraph "{title}" {{')
-        lines.append(f"  rankdir={rankdir};")
-        lines.append('  node [fontname="Helvetica" fontsize=10];')
-        lines.append('  edge [color="#666666"];')
-        lines.append("")
-
-        for name in sorted(self.graph.graph.nodes()):
-            node_data = dict(self.graph.graph.nodes[name])
-            node_type = node_data.get("node_type", "model")
-            style = NODE_STYLES.get(node_type, NODE_STYLES["model"])
-
-            attrs = dict(style)
-            if highlight_nodes and name in highlight_nodes:
-                attrs["penwidth"] = "3"
-                attrs["color"] = "red"
+        return "".join(self._iter_dot(title, highlight_nodes, rankdir))
 
+    def _iter_dot(
+        self,
+        title: str = "dbt Dependency Graph",
+        highlight_nodes: set[str | None] = None,
+        rankdir: str = "LR",
+    ) -> Iterator[str]:
+        """Gera o DOT linha a linha (cada linha com seu \\n, exceto a ultima)."""
+        yield f'digraph "{title}" {{\n'
+        yield f"  rankdir={rankdir};\n"
+        yield '  node [fontname="Helvetica" fontsize=10];\n'
+        yield '  edge [color="#666666"];\n'
+        yield "\n"
+
+        safe = self._safe_names()
+        default_attrs = _STYLE_ATTR_STR["model"]
+        node_attrs = self.graph.graph.nodes
+        for name in self.graph.sorted_nodes():
+            attr_str = _STYLE_ATTR_STR.get(
+                node_attrs[name].get("node_type", "model"), default_attrs
+            )
+            if highlight_nodes and name in highlight_nodes:
+                attr_str = f"{attr_str} {_HIGHLIGHT_ATTR_STR}"
             label = name.replace(".", "\\n")
-            attrs["label"] = label
-
-            attr_str = " ".join(f'{k}="{v}"' for k, v in attrs.items())
-            safe_name = name.replace(".", "_")
-            lines.append(f'  "{safe_name}" [{attr_str}];')
+            yield f'  "{safe[name]}" [{attr_str} label="{label}"];\n'
 
-        lines.append("")
+        yield "\n"
+        yield from self._iter_edges(safe)
+        yield "}"
 
-        for from_node, to_node in sorted(self.graph.graph.edges()):
-            safe_from = from_node.replace(".", "_")
-            safe_to = to_node.replace(".", "_")
-            lines.append(f'  "{safe_from}" -> "{safe_to}";')
+    def _safe_names(self) -> dict[str, str]:
+        """Mapeia cada no para o identificador DOT, calculado uma vez por exportacao."""
+        return {name: name.replace(".", "_") for name in self.graph.graph.nodes()}
 
-        lines.append("}")
-        return "\n".join(lines)
+    def _iter_edges(self, safe: dict[str, str]) -> Iterator[str]:
+        for from_node, to_node in self.graph.sorted_edges():
+            yield f'  "{safe[from_node]}" -> "{safe[to_node]}";\n'
 
     def export_to_file(self, filepath: Path, **kwargs: Any) -> None:
-        """Exporta grafo para arquivo DOT."""
-        dot_content = self.to_dot(**kwargs)
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(dot_content)
-        logger.info("GraphViz exportado: %s", filepath)
+        """Exporta grafo para arquivo DOT, gravando em streaming."""
+        lines = self._iter_dot(**kwargs)
+        if write_chunks_if_changed(filepath, (line.encode("utf-8") for line in lines)):
+            logger.info("GraphViz exportado: %s", filepath)
 
     def to_dot_subgraph(
         self, nodes: set[str], title: str = "Subgraph"
     ) -> str:
-        """Gera DOT para um subgrafo."""
-        sub = self.graph.get_subgraph(nodes)
-        sub_exporter = GraphvizExporter(sub)
-        return sub_exporter.to_dot(title=title)
+        """Gera DOT para um subgrafo (memoizado por versao do grafo)."""
+        if self._subgraph_version != self.graph.version:
+            self._subgraph_cache.clear()
+            self._subgraph_version = self.graph.version
+
+        key = (frozenset(nodes), title)
+        dot = self._subgraph_cache.get(key)
+        if dot is None:
+            if len(self._subgraph_cache) >= SUBGRAPH_CACHE_SIZE:
+                del self._subgraph_cache[next(iter(self._subgraph_cache))]
+            sub = self.graph.get_subgraph(nodes)
+            dot = GraphvizExporter(sub).to_dot(title=title)
+            self._subgraph_cache[key] = dot
+        return dot
 
     def to_dot_with_layers(self) -> str:
         """Gera DOT agrupando por tipo de no (source, staging, marts)."""
-        lines: list[str] = []
-        lines.append('digraph "dbt Layered Graph" {')
-        lines.append("  rankdir=LR;")
-        lines.append('  node [fontname="Helvetica" fontsize=10];')
-        lines.append("")
-
-        groups: dict[str, list[str]] = {}
-        for name in self.graph.graph.nodes():
-            node_data = dict(self.graph.graph.nodes[name])
-            node_type = node_data.get("node_type", "model")
-            if node_type not in groups:
-                groups[node_type] = []
-            groups[node_type].append(name)
-
+        buf = io.StringIO()
+        write = buf.write
+        write('digraph "dbt Layered Graph" {\n')
+        write("  rankdir=LR;\n")
+        write('  node [fontname="Helvetica" fontsize=10];\n')
+        write("\n")
+
+        # Nos ordenados uma vez: cada grupo ja sai em ordem.
+        safe = self._safe_names()
+        groups: defaultdict[str, list[str]] = defaultdict(list)
+        node_attrs = self.graph.graph.nodes
+        for name in self.graph.sorted_nodes():
+            groups[node_attrs[name].get("node_type", "model")].append(name)
+
+        default_attrs = _STYLE_ATTR_STR["model"]
         for idx, (group_name, nodes) in enumerate(sorted(groups.items())):
-            lines.append(f"  subgraph cluster_{idx} {{")
-            lines.append(f'    label="{group_name}";')
-            lines.append('    style="dashed";')
-            for name in sorted(nodes):
-                safe_name = name.replace(".", "_")
-                style = NODE_STYLES.get(group_name, NODE_STYLES["model"])
-                attr_str = " ".join(f'{k}="{v}"' for k, v in style.items())
-                lines.append(f'    "{safe_name}" [{attr_str} label="{name}"];')
-            lines.append("  }")
-            lines.append("")
-
-        for from_node, to_node in sorted(self.graph.graph.edges()):
-            safe_from = from_node.replace(".", "_")
-            safe_to = to_node.replace(".", "_")
-            lines.append(f'  "{safe_from}" -> "{safe_to}";')
-
-        lines.append("}")
-        return "\n".join(lines)
-
+            attr_str = _STYLE_ATTR_STR.get(group_name, default_attrs)
+            write(f"  subgraph cluster_{idx} {{\n")
+            write(f'    label="{group_name}";\n')
+            write('    style="dashed";\n')
+            for name in nodes:
+                write(f'    "{safe[name]}" [{attr_str} label="{name}"];\n')
+            write("  }\n")
+            write("\n")
+
+        buf.writelines(self._iter_edges(safe))
+        write("}")
+        return buf.getvalue()
@@ -1,5 +1,6 @@
 """Exportador de resultados para formato JSON."""
 
+import functools
 import json
 import logging
 from dataclasses import asdict, is_dataclass
@@ -9,9 +10,25 @@ from typing import Any
 
 from dbt_parser.analyzers.graph_resolver import GraphResolver
 from dbt_parser.analyzers.dependency_analyzer import DependencyReport
+from dbt_parser.utils.cache import write_if_changed
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional: cai no json da stdlib
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=None)
+def _log_json_backend() -> None:
+    """Informa uma unica vez qual encoder JSON esta ativo."""
+    if orjson is None:
+        logger.info("Backend JSON: json (stdlib); instale orjson para exportacao mais rapida")
+    else:
+        logger.info("Backend JSON: orjson")
+
 class DataclassEncoder(json.JSONEncoder):
     """Encoder JSON para dataclasses e tipos especiais."""
 
@@ -20,34 +37,35 @@ class DataclassEncoder(json.JSONEncoder):
             return asdict(obj)
         if isinstance(obj, Path):
             return str(obj)
-        if isinstance(obj, set):
-            return sorted(list(obj))
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj)
         if isinstance(obj, datetime):
             return obj.isoformat()
         return super().default(obj)
 
+_ENCODER = DataclassEncoder()
+
+def _orjson_default(obj: Any) -> Any:
+    """Tipos que o orjson nao serializa nativamente (mesmas regras do DataclassEncoder)."""
+    return _ENCODER.default(obj)
+
 class JsonExporter:
     """Exporta dados de analise dbt para JSON."""
 
     def __init__(self, indent: int = 2) -> None:
         self.indent = indent
+        _log_json_backend()
 
     def export_graph(self, graph: GraphResolver) -> dict[str, Any]:
         """Exporta grafo de dependencias para estrutura JSON."""
-        nodes: list[dict[str, Any]] = []
-        for name in graph.graph.nodes():
-            node_data = dict(graph.graph.nodes[name])
-            node_data["name"] = name
-            nodes.append(node_data)
-
-        edges: list[dict[str, str]] = []
-        for from_node, to_node in graph.graph.edges():
-            edges.append({"from": from_node, "to": to_node})
+        g = graph.graph
+        nodes = [{**attrs, "name": name} for name, attrs in g.nodes(data=True)]
+        edges = [{"from": from_node, "to": to_node} for from_node, to_node in g.edges()]
 
         return {
             "metadata": {
-                "node_count": graph.node_count(),
-                "edge_count": graph.edge_count(),
+                "node_count": len(nodes),
+                "edge_count": len(edges),
                 "exported_at": datetime.now().isoformat(),
             },
             "nodes": nodes,
@@ -62,12 +80,34 @@ class JsonExporter:
         """Exporta relatorios de dependencia para JSON."""
         return [asdict(r) for r in reports]
 
+    def _use_orjson(self) -> bool:
+        # So com indent=2 o layout do orjson coincide com o do json da stdlib.
+        return JSON_BACKEND == "orjson" and self.indent == 2
+
+    @staticmethod
+    def _dumps_orjson(data: Any) -> bytes | None:
+        """Serializa com orjson; None quando ele recusa os dados (ex.: int > 64 bits)."""
+        try:
+            return orjson.dumps(
+                data,
+                default=_orjson_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2,
+            )
+        except TypeError as exc:
+            logger.debug("orjson recusou os dados, usando json da stdlib: %s", exc)
+            return None
+
     def export_to_file(self, data: Any, filepath: Path) -> None:
-        """Exporta dados para arquivo JSON."""
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=self.indent, cls=DataclassEncoder, ensure_ascii=False)
-        logger.info("Exportado para: %s", filepath)
+        """Exporta dados para arquivo JSON (via orjson quando instalado e indent=2).
+
+        Unica diferenca conhecida entre os backends: floats nao finitos viram
+        null no orjson, enquanto a stdlib escreve NaN/Infinity (JSON invalido).
+        """
+        content = self._dumps_orjson(data) if self._use_orjson() else None
+        if content is None:
+            content = self.export_to_string(data).encode("utf-8")
+        if write_if_changed(filepath, content):
+            logger.info("Exportado para: %s", filepath)
 
     def export_to_string(self, data: Any) -> str:
         """Exporta dados para string JSON."""
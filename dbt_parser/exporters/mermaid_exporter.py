@@ -1,10 +1,12 @@
 """Exportador de grafos para formato Mermaid."""
 
 import logging
+from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 from dbt_parser.analyzers.graph_resolver import GraphResolver
+from dbt_parser.utils.cache import write_chunks_if_changed
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +16,14 @@ MERMAID_SHAPES = {
     "seed": ("{{", "}}"),
     "test": ("{", "}"),
 }
+_DEFAULT_SHAPE = ("[", "]")
+
+def _encode_joined(lines: Iterable[str]) -> Iterator[bytes]:
+    """Equivale a "\\n".join(lines).encode("utf-8"), linha a linha."""
+    separator = ""
+    for line in lines:
+        yield f"{separator}{line}".encode("utf-8")
+        separator = "\n"
 
 class MermaidExporter:
     """Exporta grafos de dependencia para formato Mermaid."""
@@ -28,71 +38,63 @@ class MermaidExporter:
         highlight_nodes: set[str | None] = None,
     ) -> str:
         """Gera diagrama Mermaid do grafo."""
-        lines: list[str] = []
+        return "\n".join(self._iter_mermaid_lines(direction, title, highlight_nodes))
 
+    def _iter_mermaid_lines(
+        self,
+        direction: str = "LR",
+        title: str | None = None,
+        highlight_nodes: set[str | None] = None,
+    ) -> Iterator[str]:
+        """Gera as linhas do diagrama (sem \n) uma a uma."""
         if title:
-            lines.append(f"---")
-            lines.append(f"title: {title}")
-            lines.append(f"---")
-
-        lines.append(f"graph {direction}")
+            yield "---"
+            yield f"title: {title}"
+            yield "---"
 
-        for name in sorted(self.graph.graph.nodes()):
-            node_data = dict(self.graph.graph.nodes[name])
-            node_type = node_data.get("node_type", "model")
-            left, right = MERMAID_SHAPES.get(node_type, ("[", "]"))
-            safe_name = self._safe_id(name)
-            lines.append(f"    {safe_name}{left}{name}{right}")
+        yield f"graph {direction}"
 
-        lines.append("")
+        safe = self._safe_names()
+        node_types = self._node_types()
+        for name in self.graph.sorted_nodes():
+            left, right = MERMAID_SHAPES.get(node_types[name], _DEFAULT_SHAPE)
+            yield f"    {safe[name]}{left}{name}{right}"
 
-        for from_node, to_node in sorted(self.graph.graph.edges()):
-            safe_from = self._safe_id(from_node)
-            safe_to = self._safe_id(to_node)
-            lines.append(f"    {safe_from} --> {safe_to}")
+        yield ""
+        yield from self._iter_edge_lines(safe)
 
         if highlight_nodes:
-            lines.append("")
+            yield ""
             for node in sorted(highlight_nodes):
-                safe = self._safe_id(node)
-                lines.append(f"    style {safe} fill:#ff6b6b,stroke:#333,stroke-width:3px")
-
-        return "\n".join(lines)
+                safe_node = safe.get(node) or self._safe_id(node)
+                yield f"    style {safe_node} fill:#ff6b6b,stroke:#333,stroke-width:3px"
 
     def export_to_file(self, filepath: Path, **kwargs: Any) -> None:
-        """Exporta diagrama Mermaid para arquivo."""
-        content = self.to_mermaid(**kwargs)
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(content)
-        logger.info("Mermaid exportado: %s", filepath)
+        """Exporta diagrama Mermaid para arquivo, gravando em streaming."""
+        lines = self._iter_mermaid_lines(**kwargs)
+        if write_chunks_if_changed(filepath, _encode_joined(lines)):
+            logger.info("Mermaid exportado: %s", filepath)
 
     def to_mermaid_with_subgraphs(self) -> str:
         """Gera Mermaid com subgrafos por tipo."""
         lines: list[str] = ["graph LR"]
 
-        groups: dict[str, list[str]] = {}
-        for name in self.graph.graph.nodes():
-            node_data = dict(self.graph.graph.nodes[name])
-            node_type = node_data.get("node_type", "model")
-            if node_type not in groups:
-                groups[node_type] = []
-            groups[node_type].append(name)
+        # Nos ja ordenados: cada grupo sai em ordem sem novo sort.
+        node_types = self._node_types()
+        groups: defaultdict[str, list[str]] = defaultdict(list)
+        for name in self.graph.sorted_nodes():
+            groups[node_types[name]].append(name)
 
+        safe = self._safe_names()
         for group_name, nodes in sorted(groups.items()):
             lines.append(f"    subgraph {group_name}")
-            for name in sorted(nodes):
-                safe = self._safe_id(name)
-                left, right = MERMAID_SHAPES.get(group_name, ("[", "]"))
-                lines.append(f"        {safe}{left}{name}{right}")
+            left, right = MERMAID_SHAPES.get(group_name, _DEFAULT_SHAPE)
+            for name in nodes:
+                lines.append(f"        {safe[name]}{left}{name}{right}")
             lines.append("    end")
 
         lines.append("")
-
-        for from_node, to_node in sorted(self.graph.graph.edges()):
-            safe_from = self._safe_id(from_node)
-            safe_to = self._safe_id(to_node)
-            lines.append(f"    {safe_from} --> {safe_to}")
+        lines.extend(self._iter_edge_lines(safe))
 
         return "\n".join(lines)
 
@@ -106,6 +108,18 @@ class MermaidExporter:
         sub_exporter = MermaidExporter(sub)
         return sub_exporter.to_mermaid(highlight_nodes={model_name})
 
+    def _safe_names(self) -> dict[str, str]:
+        """Mapeia cada no para o ID Mermaid, calculado uma vez por exportacao."""
+        return {name: self._safe_id(name) for name in self.graph.graph.nodes()}
+
+    def _node_types(self) -> dict[str, str]:
+        """Tipo de cada no numa unica passada pela view de atributos."""
+        return dict(self.graph.graph.nodes(data="node_type", default="model"))
+
+    def _iter_edge_lines(self, safe: dict[str, str]) -> Iterator[str]:
+        for from_node, to_node in self.graph.sorted_edges():
+            yield f"    {safe[from_node]} --> {safe[to_node]}"
+
     @staticmethod
     def _safe_id(name: str) -> str:
         """Converte nome para ID seguro para Mermaid."""
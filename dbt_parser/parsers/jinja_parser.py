@@ -7,7 +7,26 @@ from typing import Any
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+EXPRESSION_PATTERN = re.compile(r"{{(.*?)}}", re.DOTALL)
+STATEMENT_PATTERN = re.compile(r"{%(.*?)%}", re.DOTALL)
+COMMENT_PATTERN = re.compile(r"{#(.*?)#}", re.DOTALL)
+VARIABLE_PATTERN = re.compile(r"\bvar\(\s*['\"](\w+)['\"]\s*\)")
+FILTER_PATTERN = re.compile(r"\|\s*(\w+)")
+SET_PATTERN = re.compile(r"{%\s*set\s+(\w+)\s*=")
+IF_PATTERN = re.compile(r"{%\s*if\b")
+FOR_PATTERN = re.compile(r"{%\s*for\b")
+# Varredura unica: lastgroup indica o tipo do bloco casado.
+BLOCK_PATTERN = re.compile(
+    r"{#(?P<comment>.*?)#}|{%(?P<statement>.*?)%}|{{(?P<expression>.*?)}}", re.DOTALL
+)
+# Aplicado ao interior de um statement (equivale a IF/FOR/SET_PATTERN).
+CONTROL_PATTERN = re.compile(r"\s*(?:(if|for)\b|(set)\s+\w+\s*=)")
+
+SCAN_CACHE_SIZE = 256
+
+_Scan = tuple[tuple["JinjaBlock", ...], tuple[str, ...], tuple[str, ...], tuple[str, ...]]
+
+@dataclass(slots=True, frozen=True)
 class JinjaBlock:
     """Bloco Jinja identificado no SQL."""
 
@@ -16,7 +35,7 @@ class JinjaBlock:
     start_pos: int
     end_pos: int
 
-@dataclass
+@dataclass(slots=True)
 class JinjaAnalysis:
     """Resultado da analise Jinja de um arquivo SQL."""
 
@@ -29,52 +48,83 @@ class JinjaAnalysis:
 class JinjaParser:
     """Parser para blocos Jinja em SQL dbt."""
 
-    EXPRESSION_PATTERN = re.compile(r"{{(.*?)}}", re.DOTALL)
-    STATEMENT_PATTERN = re.compile(r"{%(.*?)%}", re.DOTALL)
-    COMMENT_PATTERN = re.compile(r"{#(.*?)#}", re.DOTALL)
-    VARIABLE_PATTERN = re.compile(r"\bvar\(\s*['\"](\w+)['\"]\s*\)")
-    FILTER_PATTERN = re.compile(r"\|\s*(\w+)")
-    SET_PATTERN = re.compile(r"{%\s*set\s+(\w+)\s*=")
-    IF_PATTERN = re.compile(r"{%\s*if\b")
-    FOR_PATTERN = re.compile(r"{%\s*for\b")
+    # Aliases das constantes de modulo (API publica anterior).
+    EXPRESSION_PATTERN = EXPRESSION_PATTERN
+    STATEMENT_PATTERN = STATEMENT_PATTERN
+    COMMENT_PATTERN = COMMENT_PATTERN
+    VARIABLE_PATTERN = VARIABLE_PATTERN
+    FILTER_PATTERN = FILTER_PATTERN
+    SET_PATTERN = SET_PATTERN
+    IF_PATTERN = IF_PATTERN
+    FOR_PATTERN = FOR_PATTERN
+    BLOCK_PATTERN = BLOCK_PATTERN
+    CONTROL_PATTERN = CONTROL_PATTERN
 
     def __init__(self) -> None:
         self._analyses: dict[str, JinjaAnalysis] = {}
+        # Conteudo -> varredura; conteudos repetidos (mesma macro analisada
+        # em varios contextos) nao passam de novo pelas regex.
+        self._scan_cache: dict[str, _Scan] = {}
+
+    def _scan(self, content: str) -> _Scan:
+        """Versao memoizada de _scan_uncached (tuplas, compartilhaveis)."""
+        scan = self._scan_cache.get(content)
+        if scan is None:
+            if len(self._scan_cache) >= SCAN_CACHE_SIZE:
+                del self._scan_cache[next(iter(self._scan_cache))]
+            blocks, variables, filters, controls = self._scan_uncached(content)
+            scan = (tuple(blocks), tuple(variables), tuple(filters), tuple(controls))
+            self._scan_cache[content] = scan
+        return scan
+
+    def _scan_uncached(
+        self, content: str
+    ) -> tuple[list[JinjaBlock], list[str], list[str], list[str]]:
+        """Percorre o conteudo uma vez e classifica cada bloco Jinja.
+
+        Retorna (blocos, variaveis, filtros, estruturas de controle), com
+        repeticoes, na ordem em que aparecem. Variaveis e filtros sao
+        procurados apenas dentro de statements e expressions.
+        """
+        blocks: list[JinjaBlock] = []
+        variables: list[str] = []
+        filters: list[str] = []
+        controls: list[str] = []
+        find_vars = VARIABLE_PATTERN.findall
+        find_filters = FILTER_PATTERN.findall
+        match_control = CONTROL_PATTERN.match
+        append_block = blocks.append
+        for match in BLOCK_PATTERN.finditer(content):
+            kind = match.lastgroup
+            inner = match.group(kind)
+            append_block(
+                JinjaBlock(
+                    block_type=kind,
+                    content=inner.strip(),
+                    start_pos=match.start(),
+                    end_pos=match.end(),
+                )
+            )
+            if kind == "comment":
+                continue
+            variables.extend(find_vars(inner))
+            filters.extend(find_filters(inner))
+            if kind == "statement":
+                control = match_control(inner)
+                if control:
+                    controls.append(control.group(1) or control.group(2))
+        return blocks, variables, filters, controls
 
     def parse_content(self, content: str, filepath: str = "") -> JinjaAnalysis:
         """Analisa conteudo Jinja de um arquivo SQL."""
-        analysis = JinjaAnalysis(filepath=filepath)
-
-        for match in self.EXPRESSION_PATTERN.finditer(content):
-            block = JinjaBlock(
-                block_type="expression",
-                content=match.group(1).strip(),
-                start_pos=match.start(),
-                end_pos=match.end(),
-            )
-            analysis.blocks.append(block)
-
-        for match in self.STATEMENT_PATTERN.finditer(content):
-            block = JinjaBlock(
-                block_type="statement",
-                content=match.group(1).strip(),
-                start_pos=match.start(),
-                end_pos=match.end(),
-            )
-            analysis.blocks.append(block)
-
-        for match in self.COMMENT_PATTERN.finditer(content):
-            block = JinjaBlock(
-                block_type="comment",
-                content=match.group(1).strip(),
-                start_pos=match.start(),
-                end_pos=match.end(),
-            )
-            analysis.blocks.append(block)
-
-        analysis.variables = set(self.VARIABLE_PATTERN.findall(content))
-        analysis.filters_used = set(self.FILTER_PATTERN.findall(content))
-        analysis.control_structures = self._extract_control_structures(content)
+        blocks, variables, filters, controls = self._scan(content)
+        analysis = JinjaAnalysis(
+            filepath=filepath,
+            blocks=list(blocks),
+            variables=set(variables),
+            control_structures=[kw for kw in ("if", "for", "set") if kw in controls],
+            filters_used=set(filters),
+        )
 
         self._analyses[filepath] = analysis
         logger.info(
@@ -85,23 +135,11 @@ class JinjaParser:
         )
         return analysis
 
-    def _extract_control_structures(self, content: str) -> list[str]:
-        """Extrai estruturas de controle Jinja."""
-        structures: list[str] = []
-        if self.IF_PATTERN.search(content):
-            structures.append("if")
-        if self.FOR_PATTERN.search(content):
-            structures.append("for")
-        if self.SET_PATTERN.search(content):
-            structures.append("set")
-        return structures
-
     def strip_jinja(self, content: str) -> str:
-        """Remove todos os blocos Jinja do SQL."""
-        result = self.COMMENT_PATTERN.sub("", content)
-        result = self.STATEMENT_PATTERN.sub("", result)
-        result = self.EXPRESSION_PATTERN.sub("''", result)
-        return result
+        """Remove todos os blocos Jinja do SQL (expressoes viram '')."""
+        return BLOCK_PATTERN.sub(
+            lambda m: "''" if m.lastgroup == "expression" else "", content
+        )
 
     def get_analysis(self, filepath: str) -> JinjaAnalysis | None:
         """Retorna analise Jinja de um arquivo."""
@@ -116,13 +154,15 @@ class JinjaParser:
 
     def get_jinja_complexity(self, content: str) -> dict[str, int]:
         """Calcula complexidade Jinja de um arquivo."""
+        blocks, variables, filters, controls = self._scan(content)
+        kinds = [block.block_type for block in blocks]
         return {
-            "expressions": len(self.EXPRESSION_PATTERN.findall(content)),
-            "statements": len(self.STATEMENT_PATTERN.findall(content)),
-            "comments": len(self.COMMENT_PATTERN.findall(content)),
-            "variables": len(self.VARIABLE_PATTERN.findall(content)),
-            "filters": len(self.FILTER_PATTERN.findall(content)),
-            "if_blocks": len(self.IF_PATTERN.findall(content)),
-            "for_loops": len(self.FOR_PATTERN.findall(content)),
+            "expressions": kinds.count("expression"),
+            "statements": kinds.count("statement"),
+            "comments": kinds.count("comment"),
+            "variables": len(variables),
+            "filters": len(filters),
+            "if_blocks": controls.count("if"),
+            "for_loops": controls.count("for"),
         }
 
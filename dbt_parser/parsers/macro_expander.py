@@ -4,7 +4,13 @@ import logging
 import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from dbt_parser.utils.files import read_source
+from dbt_parser.utils.parallel import parse_files
+
+if TYPE_CHECKING:
+    from dbt_parser.utils.cache import FileParseCache
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +18,12 @@ MACRO_DEF_PATTERN = re.compile(
     r"{%\s*macro\s+(\w+)\s*\((.*?)\)\s*%}(.*?){%\s*endmacro\s*%}",
     re.DOTALL,
 )
+MACRO_CALL_PATTERN = re.compile(r"{{\s*(\w+)\s*\(")
+EXCLUDED_CALLS = frozenset(
+    {"ref", "source", "config", "if", "else", "endif", "for", "endfor", "set"}
+)
 
-@dataclass
+@dataclass(slots=True)
 class MacroDefinition:
     """Definicao de uma macro dbt."""
 
@@ -26,9 +36,14 @@ class MacroDefinition:
 class MacroExpander:
     """Gerencia e expande macros Jinja de projetos dbt."""
 
-    def __init__(self, project_dir: Path) -> None:
+    def __init__(
+        self, project_dir: Path, file_cache: "FileParseCache | None" = None
+    ) -> None:
         self.project_dir = project_dir
+        self.file_cache = file_cache
         self._macros: dict[str, MacroDefinition] = {}
+        # EXCLUDED_CALLS mais as macros registradas: um unico teste por chamada.
+        self._skip_calls: set[str] = set(EXCLUDED_CALLS)
 
     def find_macro_files(self) -> list[Path]:
         """Encontra todos os arquivos de macros."""
@@ -42,24 +57,20 @@ class MacroExpander:
         if not filepath.exists():
             return []
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+        if self.file_cache is not None:
+            definitions = self.file_cache.get_or_parse(
+                filepath, lambda content: self._extract_definitions(filepath, content)
+            )
+        else:
+            definitions = self._extract_definitions(filepath, read_source(filepath))
+        return self._register(filepath, definitions)
 
+    def _register(
+        self, filepath: Path, definitions: list[tuple[str, list[str], str]]
+    ) -> list[MacroDefinition]:
         macros: list[MacroDefinition] = []
-        for match in MACRO_DEF_PATTERN.finditer(content):
-            name = match.group(1)
-            params_str = match.group(2).strip()
-            body = match.group(3).strip()
-
-            params = []
-            if params_str:
-                for param in params_str.split(","):
-                    param = param.strip()
-                    if "=" in param:
-                        param = param.split("=")[0].strip()
-                    if param:
-                        params.append(param)
-
+        for name, params, body in definitions:
+            # As chamadas dependem das macros ja registradas: nao entram no cache.
             calls = self._find_macro_calls(body)
 
             macro_def = MacroDefinition(
@@ -71,14 +82,41 @@ class MacroExpander:
             )
             macros.append(macro_def)
             self._macros[name] = macro_def
+            self._skip_calls.add(name)
             logger.info("Macro encontrada: %s(%s)", name, ", ".join(params))
 
         return macros
 
-    def parse_all_macros(self) -> dict[str, MacroDefinition]:
-        """Faz parsing de todas as macros do projeto."""
-        for filepath in self.find_macro_files():
-            self.parse_macro_file(filepath)
+    @staticmethod
+    def _extract_definitions(
+        filepath: Path, content: str
+    ) -> list[tuple[str, list[str], str]]:
+        """Extrai (nome, parametros, corpo) de cada macro do conteudo (sem estado)."""
+        definitions: list[tuple[str, list[str], str]] = []
+        if "macro" not in content:
+            return definitions
+        for match in MACRO_DEF_PATTERN.finditer(content):
+            params_str = match.group(2).strip()
+            params = []
+            if params_str:
+                for param in params_str.split(","):
+                    param = param.strip()
+                    if "=" in param:
+                        param = param.split("=")[0].strip()
+                    if param:
+                        params.append(param)
+            definitions.append((match.group(1), params, match.group(3).strip()))
+        return definitions
+
+    def parse_all_macros(self, jobs: int = 1) -> dict[str, MacroDefinition]:
+        """Faz parsing de todas as macros do projeto (extracao em jobs processos)."""
+        files = self.find_macro_files()
+        extracted = parse_files(files, self._extract_definitions, jobs, self.file_cache)
+        # O registro fica sequencial: as chamadas dependem da ordem dos arquivos.
+        for filepath, definitions in zip(files, extracted):
+            self._register(filepath, definitions)
+        if self.file_cache is not None:
+            self.file_cache.save()
         return self._macros.copy()
 
     def get_macro(self, name: str) -> MacroDefinition | None:
@@ -103,10 +141,10 @@ class MacroExpander:
 
     def _find_macro_calls(self, content: str) -> list[str]:
         """Encontra chamadas de macros em conteudo Jinja."""
-        excluded = {"ref", "source", "config", "if", "else", "endif", "for", "endfor", "set"}
-        pattern = re.compile(r"{{\s*(\w+)\s*\(")
-        calls = pattern.findall(content)
-        return [c for c in calls if c not in excluded and c not in self._macros]
+        if "{{" not in content:
+            return []
+        skip = self._skip_calls
+        return [c for c in MACRO_CALL_PATTERN.findall(content) if c not in skip]
 
     def get_macro_summary(self) -> dict[str, Any]:
         """Retorna resumo de macros do projeto."""
@@ -9,7 +9,7 @@ from dbt_parser.parsers.yaml_parser import YamlParser
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class ColumnInfo:
     """Informacoes de uma coluna de modelo dbt."""
 
@@ -18,7 +18,7 @@ class ColumnInfo:
     tests: list[dict[str, Any]] = field(default_factory=list)
     meta: dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class ModelInfo:
     """Informacoes de um modelo dbt extraidas do schema.yml."""
 
@@ -29,7 +29,7 @@ class ModelInfo:
     meta: dict[str, Any] = field(default_factory=dict)
     tags: list[str] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class SourceInfo:
     """Informacoes de um source dbt."""
 
@@ -44,7 +44,9 @@ class SchemaExtractor:
     def __init__(self, yaml_parser: YamlParser) -> None:
         self.yaml_parser = yaml_parser
         self._models: list[ModelInfo] = []
+        self._models_by_name: dict[str, ModelInfo] = {}
         self._sources: list[SourceInfo] = []
+        self.version: int = 0
 
     def extract_models(self, content: dict[str, Any]) -> list[ModelInfo]:
         """Extrai modelos de um schema.yml parseado."""
@@ -74,6 +76,10 @@ class SchemaExtractor:
             models.append(model)
 
         self._models.extend(models)
+        for model in models:
+            # Mantem a primeira ocorrencia, como a busca linear fazia.
+            self._models_by_name.setdefault(model.name, model)
+        self.version += 1
         logger.info("Extraidos %d modelos do schema", len(models))
         return models
 
@@ -92,6 +98,7 @@ class SchemaExtractor:
             sources.append(source)
 
         self._sources.extend(sources)
+        self.version += 1
         logger.info("Extraidos %d sources", len(sources))
         return sources
 
@@ -105,10 +112,7 @@ class SchemaExtractor:
 
     def get_model_by_name(self, name: str) -> ModelInfo | None:
         """Busca modelo por nome."""
-        for model in self._models:
-            if model.name == name:
-                return model
-        return None
+        return self._models_by_name.get(name)
 
     def get_column_tests(self, model_name: str) -> dict[str, list[dict[str, Any]]]:
         """Retorna testes por coluna de um modelo."""
@@ -9,7 +9,7 @@ from dbt_parser.parsers.yaml_parser import YamlParser
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class SourceTable:
     """Tabela de um source dbt."""
 
@@ -20,7 +20,7 @@ class SourceTable:
     loaded_at_field: str | None = None
     freshness: dict[str, Any | None] = None
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     """Source dbt completo."""
 
@@ -5,6 +5,13 @@ import logging
 import re
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from dbt_parser.utils.files import read_source
+from dbt_parser.utils.parallel import parse_files
+
+if TYPE_CHECKING:
+    from dbt_parser.utils.cache import FileParseCache
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +20,27 @@ SOURCE_PATTERN = re.compile(
     r"{{\s*source\(\s*['\"](\w+)['\"]\s*,\s*['\"](\w+)['\"]\s*\)\s*}}"
 )
 CONFIG_PATTERN = re.compile(r"{{\s*config\((.*?)\)\s*}}", re.DOTALL)
-MACRO_CALL_PATTERN = re.compile(r"{{\s*(\w+)\((.*?)\)\s*}}")
+MACRO_CALL_PATTERN = re.compile(r"{{\s*(\w+)\(.*?\)\s*}}")
+# Padroes simples de CTE (nao usados por _extract_ctes, mantidos para consumidores).
+CTE_PATTERN = re.compile(r"with\s+(\w+)\s+as\s*\(", re.IGNORECASE)
+CTE_NAMED_PATTERN = re.compile(r"(\w+)\s+as\s*\(", re.IGNORECASE)
+# Tokens relevantes para localizar CTEs; literais, comentarios e blocos Jinja
+# viram um unico token ignorado (o que houver dentro deles nao conta).
+CTE_TOKEN_PATTERN = re.compile(
+    r"'(?:[^'\\]|\\.)*'|--[^\n]*|/\*.*?\*/|{#.*?#}|{%.*?%}|{{.*?}}"
+    r'|"(?:[^"]|"")*"|`[^`]*`|[(),]|\w+',
+    re.DOTALL,
+)
+# Fora do cabecalho de um WITH so parenteses e a palavra WITH importam.
+CTE_SCAN_PATTERN = re.compile(
+    r"'(?:[^'\\]|\\.)*'|--[^\n]*|/\*.*?\*/|{#.*?#}|{%.*?%}|{{.*?}}"
+    r'|"(?:[^"]|"")*"|`[^`]*`|[()]|\bwith\b',
+    re.DOTALL | re.IGNORECASE,
+)
+_SKIPPED_TOKEN_STARTS = ("'", "--", "/*", "{")
+EXCLUDED_MACRO_CALLS = frozenset({"ref", "source", "config", "if", "else", "endif", "for", "endfor"})
 
-@dataclass
+@dataclass(slots=True)
 class SqlModelInfo:
     """Informacoes extraidas de um arquivo SQL dbt."""
 
@@ -31,17 +56,22 @@ class SqlModelInfo:
 class SqlParser:
     """Parser para arquivos SQL de projetos dbt."""
 
-    CTE_PATTERN = re.compile(
-        r"with\s+(\w+)\s+as\s*\(", re.IGNORECASE
-    )
-    CTE_NAMED_PATTERN = re.compile(
-        r"(\w+)\s+as\s*\(", re.IGNORECASE
-    )
+    # Aliases das constantes de modulo (API publica anterior).
+    CTE_PATTERN = CTE_PATTERN
+    CTE_NAMED_PATTERN = CTE_NAMED_PATTERN
+
+    def __init__(
+        self, project_dir: Path, file_cache: "FileParseCache | None" = None
+    ) -> None:
+        """Inicializa o parser com o diretorio do projeto dbt.
 
-    def __init__(self, project_dir: Path) -> None:
-        """Inicializa o parser com o diretorio do projeto dbt."""
+        Com file_cache, arquivos inalterados desde o ultimo parse_all nao
+        sao reparseados.
+        """
         self.project_dir = project_dir
+        self.file_cache = file_cache
         self._parsed_models: dict[str, SqlModelInfo] = {}
+        self.version: int = 0
 
     def parse_file(self, filepath: Path) -> SqlModelInfo:
         """Faz parsing de um arquivo SQL individual."""
@@ -49,31 +79,37 @@ class SqlParser:
             logger.warning("Arquivo SQL nao encontrado: %s", filepath)
             return SqlModelInfo(filepath=filepath, name=filepath.stem)
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+        if self.file_cache is not None:
+            model_info = self.file_cache.get_or_parse(
+                filepath, lambda content: self._parse_content(filepath, content)
+            )
+        else:
+            model_info = self._parse_content(filepath, read_source(filepath))
+        self._register(model_info)
+        return model_info
 
-        model_name = filepath.stem
-        refs = self._extract_refs(content)
-        sources = self._extract_sources(content)
-        config = self._extract_config(content)
-        macro_calls = self._extract_macro_calls(content)
-        ctes = self._extract_ctes(content)
+    def _register(self, model_info: SqlModelInfo) -> None:
+        self._parsed_models[model_info.name] = model_info
+        self.version += 1
+        logger.info(
+            "SQL parsed: %s (refs=%d, sources=%d)",
+            model_info.name, len(model_info.refs), len(model_info.sources),
+        )
 
-        model_info = SqlModelInfo(
+    @classmethod
+    def _parse_content(cls, filepath: Path, content: str) -> SqlModelInfo:
+        """Extrai as informacoes do modelo a partir do conteudo SQL (sem estado)."""
+        return SqlModelInfo(
             filepath=filepath,
-            name=model_name,
-            refs=refs,
-            sources=sources,
-            config=config,
-            macro_calls=macro_calls,
+            name=filepath.stem,
+            refs=cls._extract_refs(content),
+            sources=cls._extract_sources(content),
+            config=cls._extract_config(content),
+            macro_calls=cls._extract_macro_calls(content),
             raw_sql=content,
-            ctes=ctes,
+            ctes=cls._extract_ctes(content),
         )
 
-        self._parsed_models[model_name] = model_info
-        logger.info("SQL parsed: %s (refs=%d, sources=%d)", model_name, len(refs), len(sources))
-        return model_info
-
     def find_sql_files(self) -> list[Path]:
         """Encontra todos os arquivos SQL no projeto."""
         models_dir = self.project_dir / "models"
@@ -82,22 +118,43 @@ class SqlParser:
             return []
         return sorted(models_dir.glob("**/*.sql"))
 
-    def parse_all(self) -> dict[str, SqlModelInfo]:
-        """Faz parsing de todos os arquivos SQL."""
-        for filepath in self.find_sql_files():
-            self.parse_file(filepath)
+    def parse_all(self, jobs: int = 1) -> dict[str, SqlModelInfo]:
+        """Faz parsing de todos os arquivos SQL (em jobs processos se > 1)."""
+        files = self.find_sql_files()
+        for model_info in parse_files(files, self._parse_content, jobs, self.file_cache):
+            self._register(model_info)
+        if self.file_cache is not None:
+            self.file_cache.save()
         return self._parsed_models.copy()
 
-    def _extract_refs(self, content: str) -> list[str]:
+    def load_models(self, models: dict[str, SqlModelInfo]) -> None:
+        """Registra modelos ja parseados (ex.: vindos do cache da CLI)."""
+        self._parsed_models.update(models)
+        self.version += 1
+
+    # Cada extrator testa antes um literal com ``in`` (busca em C): arquivos sem
+    # o marcador nao pagam a varredura de regex. refs, sources e chamadas de
+    # macro saem sem repeticoes, na ordem da primeira ocorrencia.
+
+    @staticmethod
+    def _extract_refs(content: str) -> list[str]:
         """Extrai referencias ref() do SQL."""
-        return REF_PATTERN.findall(content)
+        if "ref(" not in content:
+            return []
+        return list(dict.fromkeys(REF_PATTERN.findall(content)))
 
-    def _extract_sources(self, content: str) -> list[tuple[str, str]]:
+    @staticmethod
+    def _extract_sources(content: str) -> list[tuple[str, str]]:
         """Extrai referencias source() do SQL."""
-        return SOURCE_PATTERN.findall(content)
+        if "source(" not in content:
+            return []
+        return list(dict.fromkeys(SOURCE_PATTERN.findall(content)))
 
-    def _extract_config(self, content: str) -> dict[str, str]:
+    @staticmethod
+    def _extract_config(content: str) -> dict[str, str]:
         """Extrai configuracao do bloco config()."""
+        if "config(" not in content:
+            return {}
         match = CONFIG_PATTERN.search(content)
         if not match:
             return {}
@@ -109,24 +166,88 @@ class SqlParser:
             config[key.strip()] = value.strip()
         return config
 
-    def _extract_macro_calls(self, content: str) -> list[str]:
+    @staticmethod
+    def _extract_macro_calls(content: str) -> list[str]:
         """Extrai chamadas de macros do SQL."""
-        excluded = {"ref", "source", "config", "if", "else", "endif", "for", "endfor"}
-        calls = MACRO_CALL_PATTERN.findall(content)
-        return [name for name, _ in calls if name not in excluded]
+        if "{{" not in content:
+            return []
+        return [
+            name for name in dict.fromkeys(MACRO_CALL_PATTERN.findall(content))
+            if name not in EXCLUDED_MACRO_CALLS
+        ]
+
+    @staticmethod
+    def _extract_ctes(content: str) -> list[str]:
+        """Extrai nomes de CTEs do SQL, inclusive de WITH aninhados.
 
-    def _extract_ctes(self, content: str) -> list[str]:
-        """Extrai nomes de CTEs do SQL."""
-        clean_content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-        clean_content = re.sub(r"--.*$", "", clean_content, flags=re.MULTILINE)
-        clean_content = re.sub(r"{{.*?}}", "", clean_content, flags=re.DOTALL)
+        Percorre os tokens uma unica vez com uma pilha de listas WITH abertas
+        (profundidade de parenteses + estado). So conta como CTE um
+        ``nome [(colunas)] as [not] [materialized] (`` logo apos WITH ou apos
+        a virgula que fecha o corpo anterior.
+        """
+        if "with" not in content.lower():
+            return []
 
         ctes: list[str] = []
-        cte_blocks = re.split(r"\bwith\b", clean_content, flags=re.IGNORECASE)
-        if len(cte_blocks) > 1:
-            after_with = cte_blocks[1]
-            names = self.CTE_NAMED_PATTERN.findall(after_with)
-            ctes = [n for n in names if n.lower() not in ("select", "from", "where")]
+        # Cada item: [profundidade da lista, estado, nome pendente].
+        stack: list[list[Any]] = []
+        depth = 0
+        header_search = CTE_TOKEN_PATTERN.search
+        scan_search = CTE_SCAN_PATTERN.search
+        pos = 0
+        while True:
+            in_header = bool(stack) and depth == stack[-1][0]
+            match = (header_search if in_header else scan_search)(content, pos)
+            if match is None:
+                break
+            pos = match.end()
+            token = match.group()
+            if token.startswith(_SKIPPED_TOKEN_STARTS):
+                continue
+            if token == "(":
+                depth += 1
+                if stack and depth == stack[-1][0] + 1:
+                    frame = stack[-1]
+                    if frame[1] == "as":
+                        ctes.append(frame[2])
+                        frame[1] = "body"
+                    elif frame[1] == "name":
+                        frame[1] = "columns"
+                    else:
+                        stack.pop()
+                continue
+            if token == ")":
+                depth -= 1
+                while stack and depth < stack[-1][0]:
+                    stack.pop()
+                if stack and depth == stack[-1][0]:
+                    frame = stack[-1]
+                    if frame[1] == "body":
+                        frame[1] = "after_body"
+                    elif frame[1] == "columns":
+                        frame[1] = "name"
+                continue
+
+            word = token.lower()
+            if stack and depth == stack[-1][0]:
+                frame = stack[-1]
+                state = frame[1]
+                if state == "expect_name":
+                    if word != "recursive" and token != ",":
+                        frame[1] = "name"
+                        frame[2] = token.strip('"`')
+                    continue
+                if state == "name" and word == "as":
+                    frame[1] = "as"
+                    continue
+                if state == "as" and word in ("not", "materialized"):
+                    continue
+                if state == "after_body" and token == ",":
+                    frame[1] = "expect_name"
+                    continue
+                stack.pop()
+            if word == "with":
+                stack.append([depth, "expect_name", None])
         return ctes
 
     def get_model(self, name: str) -> SqlModelInfo | None:
@@ -1,16 +1,18 @@
 """Extrator de testes dbt (schema tests e data tests)."""
 
 import logging
-import re
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 from dbt_parser.parsers.schema_extractor import SchemaExtractor
+from dbt_parser.parsers.sql_parser import REF_PATTERN
+from dbt_parser.utils.files import find_files, read_source
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class DbtTest:
     """Representacao de um teste dbt."""
 
@@ -31,6 +33,10 @@ class TestExtractor:
         self.schema_extractor = schema_extractor
         self.project_dir = project_dir
         self._tests: list[DbtTest] = []
+        self._by_model: defaultdict[str | None, list[DbtTest]] = defaultdict(list)
+        self.version: int = 0
+        self._stats: Counter[str] | None = None
+        self._stats_version = -1
 
     def extract_schema_tests(self) -> list[DbtTest]:
         """Extrai testes definidos no schema.yml."""
@@ -58,7 +64,7 @@ class TestExtractor:
                             )
                             tests.append(dbt_test)
 
-        self._tests.extend(tests)
+        self._add_tests(tests)
         logger.info("Extraidos %d testes de schema", len(tests))
         return tests
 
@@ -69,12 +75,12 @@ class TestExtractor:
         if not tests_dir.exists():
             return tests
 
-        for filepath in sorted(tests_dir.glob("**/*.sql")):
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
+        for filepath in find_files(tests_dir, (".sql",), skip_root_dirs=frozenset()):
+            content = read_source(filepath)
 
-            refs = re.findall(r"{{\s*ref\(\s*['\"](\w+)['\"]\s*\)\s*}}", content)
-            model_name = refs[0] if refs else None
+            # So o primeiro ref importa: search para no primeiro casamento.
+            match = REF_PATTERN.search(content) if "ref(" in content else None
+            model_name = match.group(1) if match else None
 
             dbt_test = DbtTest(
                 name=filepath.stem,
@@ -84,47 +90,66 @@ class TestExtractor:
             )
             tests.append(dbt_test)
 
-        self._tests.extend(tests)
+        self._add_tests(tests)
         logger.info("Extraidos %d testes de dados", len(tests))
         return tests
 
     def extract_all(self) -> list[DbtTest]:
         """Extrai todos os testes do projeto."""
         self._tests.clear()
+        self._by_model.clear()
+        self.version += 1
         self.extract_schema_tests()
         self.extract_data_tests()
         return self._tests.copy()
 
     def get_tests_by_model(self, model_name: str) -> list[DbtTest]:
         """Retorna testes de um modelo."""
-        return [t for t in self._tests if t.model_name == model_name]
+        return list(self._by_model.get(model_name, ()))
 
     def get_models_without_tests(self, all_model_names: set[str]) -> set[str]:
         """Retorna modelos sem nenhum teste."""
-        tested_models = {t.model_name for t in self._tests if t.model_name}
-        return all_model_names - tested_models
+        return all_model_names - self._tested_models()
 
     def get_test_coverage(self, all_model_names: set[str]) -> dict[str, Any]:
         """Calcula cobertura de testes."""
+        by_type = self._count_by_type()
         total = len(all_model_names)
-        tested = len({t.model_name for t in self._tests if t.model_name})
+        tested = len(self._tested_models())
         return {
             "total_models": total,
             "tested_models": tested,
             "untested_models": total - tested,
             "coverage_pct": (tested / total * 100) if total > 0 else 0,
             "total_tests": len(self._tests),
-            "schema_tests": sum(1 for t in self._tests if t.test_type == "schema"),
-            "data_tests": sum(1 for t in self._tests if t.test_type == "data"),
-            "custom_tests": sum(1 for t in self._tests if t.test_type == "custom"),
+            "schema_tests": by_type["schema"],
+            "data_tests": by_type["data"],
+            "custom_tests": by_type["custom"],
         }
 
     def get_test_summary(self) -> dict[str, int]:
         """Retorna resumo de testes."""
+        by_type = self._count_by_type()
         return {
             "total": len(self._tests),
-            "schema": sum(1 for t in self._tests if t.test_type == "schema"),
-            "data": sum(1 for t in self._tests if t.test_type == "data"),
-            "custom": sum(1 for t in self._tests if t.test_type == "custom"),
+            "schema": by_type["schema"],
+            "data": by_type["data"],
+            "custom": by_type["custom"],
         }
 
+    def _add_tests(self, tests: list[DbtTest]) -> None:
+        self._tests.extend(tests)
+        for test in tests:
+            self._by_model[test.model_name].append(test)
+        self.version += 1
+
+    def _tested_models(self) -> set[str]:
+        return {name for name in self._by_model if name}
+
+    def _count_by_type(self) -> Counter[str]:
+        """Contagem por tipo de teste, numa passada por versao."""
+        if self._stats is None or self._stats_version != self.version:
+            self._stats = Counter(test.test_type for test in self._tests)
+            self._stats_version = self.version
+        return self._stats
+
@@ -1,13 +1,34 @@
 """Parser para arquivos YAML de projetos dbt."""
 
+import functools
 import logging
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from dbt_parser.utils.files import find_files
+
 logger = logging.getLogger(__name__)
 
+# Loader em C (libyaml) quando o PyYAML foi compilado com ele; mesma semantica do SafeLoader.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_BACKEND = "libyaml" if _SafeLoader is not yaml.SafeLoader else "python"
+
+@functools.lru_cache(maxsize=None)
+def _log_yaml_backend() -> None:
+    """Informa uma unica vez qual loader YAML esta ativo."""
+    if YAML_BACKEND == "libyaml":
+        logger.info("Backend YAML: libyaml (CSafeLoader)")
+    else:
+        logger.info("Backend YAML: python puro; instale PyYAML com libyaml para parsing mais rapido")
+
+def _load_yaml_file(filepath: Path) -> Any:
+    """Carrega um arquivo YAML sem tocar em estado compartilhado."""
+    # Bytes direto para o loader: libyaml decodifica o UTF-8 em C.
+    with open(filepath, "rb") as f:
+        return yaml.load(f.read(), Loader=_SafeLoader)
+
 class YamlParser:
     """Parser para arquivos YAML de projetos dbt.
 
@@ -19,6 +40,7 @@ class YamlParser:
     def __init__(self, project_dir: Path) -> None:
         self.project_dir = project_dir
         self._parsed_files: dict[str, dict[str, Any]] = {}
+        _log_yaml_backend()
 
     def parse_file(self, filepath: Path) -> dict[str, Any]:
         """Faz parsing de um arquivo YAML individual."""
@@ -27,8 +49,7 @@ class YamlParser:
             return {}
 
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = yaml.safe_load(f)
+            content = _load_yaml_file(filepath)
             if content is None:
                 return {}
             self._parsed_files[str(filepath)] = content
@@ -39,21 +60,48 @@ class YamlParser:
             raise
 
     def find_yaml_files(self) -> list[Path]:
-        """Encontra todos os arquivos YAML no projeto dbt."""
-        yaml_files = []
-        for pattern in ("**/*.yml", "**/*.yaml"):
-            yaml_files.extend(self.project_dir.glob(pattern))
-        return sorted(yaml_files)
-
-    def parse_all(self) -> dict[str, dict[str, Any]]:
-        """Faz parsing de todos os arquivos YAML encontrados."""
+        """Encontra todos os arquivos YAML no projeto dbt.
+
+        Ignora target/, dbt_packages/ e afins na raiz (SKIPPED_ROOT_DIRS):
+        artefatos e pacotes instalados nao sao YAML do projeto.
+        """
+        return find_files(self.project_dir, (".yml", ".yaml"))
+
+    def parse_all(self, jobs: int = 1) -> dict[str, dict[str, Any]]:
+        """Faz parsing de todos os arquivos YAML encontrados.
+
+        Com jobs > 1 leitura e parsing rodam em threads; o registro em
+        _parsed_files acontece depois, na ordem dos arquivos. Um arquivo
+        invalido e logado e ignorado sem interromper os demais.
+        """
+        files = self.find_yaml_files()
+        if jobs > 1 and len(files) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(jobs, len(files))) as executor:
+                loads = [executor.submit(_load_yaml_file, fp).result for fp in files]
+        else:
+            loads = [functools.partial(_load_yaml_file, fp) for fp in files]
+
         results: dict[str, dict[str, Any]] = {}
-        for filepath in self.find_yaml_files():
-            parsed = self.parse_file(filepath)
-            if parsed:
-                results[str(filepath)] = parsed
+        for filepath, load in zip(files, loads):
+            try:
+                content = load()
+            except yaml.YAMLError as exc:
+                logger.error("Erro ao parsear YAML %s: %s", filepath, exc)
+                continue
+            if content is None:
+                continue
+            self._parsed_files[str(filepath)] = content
+            logger.info("Arquivo parsed com sucesso: %s", filepath)
+            if content:
+                results[str(filepath)] = content
         return results
 
+    def load_parsed_files(self, files: dict[str, dict[str, Any]]) -> None:
+        """Registra arquivos ja parseados (ex.: vindos do cache da CLI)."""
+        self._parsed_files.update(files)
+
     def get_parsed_files(self) -> dict[str, dict[str, Any]]:
         """Retorna arquivos ja parseados."""
         return self._parsed_files.copy()
@@ -1,9 +1,29 @@
-"""Modulos utilitarios."""
+"""Modulos utilitarios.
 
-from dbt_parser.utils.cache import ResultCache
-from dbt_parser.utils.search import FuzzySearch
+Os utilitarios sao importados sob demanda (PEP 562): os parsers usam
+utils.cache e utils.parallel sem carregar search (e com ele os analyzers).
+"""
+
+import importlib
+from typing import Any
+
+_LAZY = {
+    "ResultCache": "dbt_parser.utils.cache",
+    "FuzzySearch": "dbt_parser.utils.search",
+}
 
 __all__ = [
     "ResultCache",
     "FuzzySearch",
 ]
+
+def __getattr__(name: str) -> Any:
+    module_path = _LAZY.get(name)
+    if module_path is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module(module_path), name)
+    globals()[name] = obj
+    return obj
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,17 +1,27 @@
 """Sistema de cache para resultados de parsing."""
 
 import hashlib
+import hmac
 import json
 import logging
+import os
+import pickle
+import secrets
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Iterable, TypeVar
+
+from dbt_parser import __version__
+from dbt_parser.utils.files import read_source
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+_HASH_CHUNK = 1 << 20
+
 @dataclass
 class CacheEntry:
     """Entrada de cache."""
@@ -21,6 +31,8 @@ class CacheEntry:
     created_at: float
     ttl: float
     file_hash: str | None = None
+    file_path: Path | None = None
+    file_stamp: str | None = None
 
     @property
     def is_expired(self) -> bool:
@@ -34,6 +46,12 @@ class ResultCache:
     def __init__(self, default_ttl: float = 300.0) -> None:
         self.default_ttl = default_ttl
         self._cache: dict[str, CacheEntry] = {}
+        # Indices reversos: invalidar um arquivo toca so as chaves dele.
+        self._by_file: dict[Path, set[str]] = {}
+        self._by_file_hash: dict[str, set[str]] = {}
+        # Computacoes em andamento por chave (single-flight em get_or_compute).
+        self._inflight: dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
         self._hits: int = 0
         self._misses: int = 0
 
@@ -44,7 +62,7 @@ class ResultCache:
             self._misses += 1
             return None
         if entry.is_expired:
-            del self._cache[key]
+            self._remove(key)
             self._misses += 1
             return None
         self._hits += 1
@@ -55,59 +73,127 @@ class ResultCache:
         key: str,
         value: Any,
         ttl: float | None = None,
-        file_hash: str | None = None,
+        file_hash: str | Path | None = None,
     ) -> None:
-        """Armazena valor no cache."""
+        """Armazena valor no cache.
+
+        Com um Path em file_hash, guarda so mtime+tamanho do arquivo (sem
+        ler o conteudo) para que invalidate_by_file detecte mudancas.
+        """
+        file_path = file_stamp = None
+        if isinstance(file_hash, Path):
+            file_path = file_hash
+            file_stamp = self._fast_stamp(file_path)
+            file_hash = None
+        if key in self._cache:
+            self._remove(key)
         self._cache[key] = CacheEntry(
             key=key,
             value=value,
             created_at=time.time(),
             ttl=ttl if ttl is not None else self.default_ttl,
             file_hash=file_hash,
+            file_path=file_path,
+            file_stamp=file_stamp,
         )
+        if file_path is not None:
+            self._by_file.setdefault(file_path, set()).add(key)
+        elif file_hash:
+            self._by_file_hash.setdefault(file_hash, set()).add(key)
 
     def invalidate(self, key: str) -> bool:
         """Invalida entrada especifica do cache."""
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
             return True
         return False
 
-    def invalidate_by_file(self, filepath: Path) -> int:
-        """Invalida entradas de cache associadas a um arquivo modificado."""
-        current_hash = self._compute_file_hash(filepath)
-        invalidated = 0
+    def invalidate_by_file(self, filepath: Path, strict: bool = False) -> int:
+        """Invalida entradas de cache associadas a um arquivo modificado.
+
+        Entradas gravadas com Path comparam apenas mtime+tamanho. Com
+        strict=True, quando o carimbo bate, o conteudo e conferido pelo hash;
+        o primeiro check strict de uma entrada registra o hash de referencia.
+        """
+        current_stamp = self._fast_stamp(filepath)
+        current_hash: str | None = None
+        if self._by_file_hash or (strict and filepath in self._by_file):
+            current_hash = self._compute_file_hash(filepath)
 
         keys_to_remove = []
-        for key, entry in self._cache.items():
-            if entry.file_hash and entry.file_hash != current_hash:
+        for key in self._by_file.get(filepath, ()):
+            entry = self._cache[key]
+            if entry.file_stamp != current_stamp:
                 keys_to_remove.append(key)
+            elif strict:
+                if entry.file_hash is None:
+                    entry.file_hash = current_hash
+                elif entry.file_hash != current_hash:
+                    keys_to_remove.append(key)
+        # Entradas so com hash: todo grupo de hash diferente do atual cai.
+        for file_hash, keys in self._by_file_hash.items():
+            if file_hash != current_hash:
+                keys_to_remove.extend(keys)
 
         for key in keys_to_remove:
-            del self._cache[key]
-            invalidated += 1
-
-        return invalidated
+            self._remove(key)
+        return len(keys_to_remove)
 
     def clear(self) -> None:
         """Limpa todo o cache."""
         self._cache.clear()
+        self._by_file.clear()
+        self._by_file_hash.clear()
         self._hits = 0
         self._misses = 0
 
+    def _remove(self, key: str) -> None:
+        """Remove a entrada e suas referencias nos indices reversos."""
+        entry = self._cache.pop(key)
+        if entry.file_path is not None:
+            index, index_key = self._by_file, entry.file_path
+        elif entry.file_hash:
+            index, index_key = self._by_file_hash, entry.file_hash
+        else:
+            return
+        keys = index[index_key]
+        keys.discard(key)
+        if not keys:
+            del index[index_key]
+
     def get_or_compute(
         self,
         key: str,
         compute_fn: Callable[[], Any],
         ttl: float | None = None,
     ) -> Any:
-        """Retorna do cache ou computa e armazena."""
-        cached = self.get(key)
-        if cached is not None:
-            return cached
-        value = compute_fn()
-        self.set(key, value, ttl)
-        return value
+        """Retorna do cache ou computa e armazena.
+
+        Chamadas concorrentes para a mesma chave esperam a primeira computar,
+        em vez de repetirem compute_fn.
+        """
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            with self._lock:
+                event = self._inflight.get(key)
+                owner = event is None
+                if owner:
+                    event = self._inflight[key] = threading.Event()
+            if owner:
+                break
+            # Outra thread esta computando; relemos o cache quando terminar.
+            event.wait()
+
+        try:
+            value = compute_fn()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
 
     def get_stats(self) -> dict[str, Any]:
         """Retorna estatisticas do cache."""
@@ -119,11 +205,312 @@ class ResultCache:
             "hit_rate": (self._hits / total * 100) if total > 0 else 0,
         }
 
+    @staticmethod
+    def _fast_stamp(filepath: Path) -> str | None:
+        """Carimbo barato de mudanca: mtime em ns e tamanho do arquivo."""
+        try:
+            st = filepath.stat()
+        except OSError:
+            return None
+        return f"{st.st_mtime_ns}:{st.st_size}"
+
     @staticmethod
     def _compute_file_hash(filepath: Path) -> str | None:
         """Computa hash de um arquivo."""
         if not filepath.exists():
             return None
-        content = filepath.read_bytes()
-        return hashlib.md5(content).hexdigest()
+        # Hash de deteccao de mudanca: blake2b e mais rapido que md5 e le em blocos.
+        digest = hashlib.blake2b(digest_size=16)
+        with filepath.open("rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+_WRITE_BUFFER = 1 << 20
+
+def write_if_changed(filepath: Path, content: bytes) -> bool:
+    """Grava content em filepath apenas se o arquivo atual for diferente.
+
+    Preserva o mtime de saidas inalteradas (caches baseados em mtime continuam
+    validos). Retorna True se o arquivo foi gravado.
+    """
+    return write_chunks_if_changed(filepath, (content,))
+
+def write_chunks_if_changed(filepath: Path, chunks: Iterable[bytes]) -> bool:
+    """Versao em streaming de write_if_changed: memoria constante.
+
+    Os chunks sao comparados com o arquivo atual enquanto sao gerados; so na
+    primeira divergencia um arquivo temporario e aberto (com o prefixo ja
+    igual copiado do original) e depois movido atomicamente sobre o destino.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    try:
+        current = open(filepath, "rb")
+    except FileNotFoundError:
+        current = None
+    out = None
+    matched = 0
+    try:
+        for chunk in chunks:
+            if out is None and current is not None:
+                if current.read(len(chunk)) == chunk:
+                    matched += len(chunk)
+                    continue
+                out = _open_with_prefix(tmp_path, current, matched)
+            elif out is None:
+                out = open(tmp_path, "wb", buffering=_WRITE_BUFFER)
+            out.write(chunk)
+        if out is None and current is None:
+            # Nenhum chunk e nenhum arquivo: cria o destino vazio.
+            out = open(tmp_path, "wb", buffering=_WRITE_BUFFER)
+        elif out is None:
+            if current.read(1) == b"":
+                logger.debug("Arquivo inalterado, escrita ignorada: %s", filepath)
+                return False
+            out = _open_with_prefix(tmp_path, current, matched)
+        out.close()
+        os.replace(tmp_path, filepath)
+        return True
+    except BaseException:
+        if out is not None:
+            out.close()
+            tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if current is not None:
+            current.close()
+
+def _open_with_prefix(tmp_path: Path, current: Any, size: int) -> Any:
+    """Abre tmp_path para escrita ja contendo os primeiros size bytes de current."""
+    out = open(tmp_path, "wb", buffering=_WRITE_BUFFER)
+    current.seek(0)
+    remaining = size
+    while remaining:
+        block = current.read(min(remaining, _WRITE_BUFFER))
+        out.write(block)
+        remaining -= len(block)
+    return out
+
+CACHE_SECRET_NAME = "secret"
+_SECRET_SIZE = 32
+_MAC_SIZE = hashlib.sha256().digest_size
+
+def user_cache_dir() -> Path:
+    """Diretorio de cache do usuario ($XDG_CACHE_HOME ou ~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    return (Path(base) if base else Path.home() / ".cache") / "dbt-parser"
+
+def project_cache_dir(project_dir: Path) -> Path:
+    """Diretorio de cache de um projeto, fora da arvore do projeto analisado."""
+    project_dir = project_dir.resolve()
+    digest = hashlib.blake2b(str(project_dir).encode(), digest_size=8).hexdigest()
+    return user_cache_dir() / f"{project_dir.name}-{digest}"
+
+def _load_secret(directory: Path) -> bytes | None:
+    """Le (ou cria) a chave HMAC do diretorio de cache.
+
+    Uma chave com outro dono ou legivel por grupo/outros e recusada: entradas
+    assinadas com ela nao sao confiaveis e o cache fica desativado.
+    """
+    path = directory / CACHE_SECRET_NAME
+    try:
+        directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    except OSError as exc:
+        logger.warning("Nao foi possivel criar chave do cache: %s (%s)", path, exc)
+        return None
+    else:
+        with os.fdopen(fd, "wb") as f:
+            f.write(secrets.token_bytes(_SECRET_SIZE))
+    try:
+        stat = path.stat()
+        if hasattr(os, "getuid") and (stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+            logger.warning("Chave do cache com dono ou permissao inseguros, cache ignorado: %s", path)
+            return None
+        secret = path.read_bytes()
+    except OSError as exc:
+        logger.warning("Nao foi possivel ler chave do cache: %s (%s)", path, exc)
+        return None
+    return secret if len(secret) == _SECRET_SIZE else None
+
+def _read_signed(path: Path, secret: bytes) -> Any | None:
+    """Carrega um pickle gravado por _write_signed; None se a assinatura nao bate.
+
+    A assinatura e conferida antes do pickle.loads, entao arquivos que nao
+    foram gravados com a chave local nunca sao desserializados.
+    """
+    data = path.read_bytes()
+    mac, payload = data[:_MAC_SIZE], data[_MAC_SIZE:]
+    if not hmac.compare_digest(mac, hmac.new(secret, payload, hashlib.sha256).digest()):
+        logger.warning("Assinatura do cache invalida, ignorado: %s", path)
+        return None
+    return pickle.loads(payload)
+
+def _write_signed(path: Path, secret: bytes, value: Any) -> None:
+    """Grava value como pickle precedido do HMAC-SHA256, atomicamente."""
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(hmac.new(secret, payload, hashlib.sha256).digest())
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+class ParseCache:
+    """Cache em disco da saida dos parsers (parsing parcial da CLI).
+
+    A chave e um digest de caminho, mtime e tamanho de cada arquivo de
+    entrada mais a versao do pacote; qualquer arquivo novo, removido ou
+    alterado gera outra chave. So e mantida uma entrada por tipo. As entradas
+    sao assinadas com uma chave local (ver _load_secret); cache_dir deve ficar
+    fora do projeto analisado, como em project_cache_dir.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = cache_dir
+        self._secret: bytes | None = None
+
+    def _get_secret(self) -> bytes | None:
+        if self._secret is None:
+            self._secret = _load_secret(self.cache_dir)
+        return self._secret
+
+    @staticmethod
+    def fingerprint(files: Iterable[Path]) -> str:
+        """Digest dos metadados dos arquivos (sem ler o conteudo)."""
+        digest = hashlib.blake2b(__version__.encode(), digest_size=16)
+        for path in sorted(files):
+            stat = path.stat()
+            digest.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, kind: str, key: str) -> Path:
+        return self.cache_dir / f"{kind}-{key}.pickle"
+
+    def get(self, kind: str, key: str) -> Any | None:
+        """Retorna o resultado salvo para a chave ou None."""
+        path = self._entry_path(kind, key)
+        if not path.exists():
+            return None
+        secret = self._get_secret()
+        if secret is None:
+            return None
+        try:
+            value = _read_signed(path, secret)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            logger.warning("Cache de parsing invalido, ignorado: %s (%s)", path, exc)
+            return None
+        if value is None:
+            return None
+        logger.info("Cache de parsing reaproveitado: %s", path)
+        return value
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        """Salva o resultado e remove entradas antigas do mesmo tipo."""
+        secret = self._get_secret()
+        if secret is None:
+            return
+        path = self._entry_path(kind, key)
+        for stale in self.cache_dir.glob(f"{kind}-*.pickle"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        _write_signed(path, secret, value)
+
+    def file_cache(self, kind: str) -> "FileParseCache":
+        """Cache por arquivo do mesmo diretorio (fora do glob de put)."""
+        return FileParseCache(self.cache_dir / f"files-{kind}.pickle", self._get_secret())
+
+def content_digest(content: str) -> str:
+    """Digest curto do conteudo de um arquivo."""
+    return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+class FileParseCache:
+    """Cache em disco do parsing por arquivo (reparsing incremental).
+
+    Cada entrada guarda mtime, tamanho e digest do conteudo do arquivo junto
+    com o resultado. Se mtime e tamanho batem o arquivo nem e lido; se so o
+    conteudo bate (ex.: ``touch``) o resultado e reaproveitado sem reparsing.
+    As entradas ficam em memoria e so sao gravadas por save(), assinadas como
+    no ParseCache; sem chave valida o cache fica so em memoria. save() descarta
+    arquivos nao consultados desde o load (removidos ou renomeados).
+    """
+
+    def __init__(self, path: Path, secret: bytes | None = None) -> None:
+        self.path = path
+        self._secret = secret if secret is not None else _load_secret(path.parent)
+        self._entries: dict[str, tuple[int, int, str, Any]] = self._load()
+        self._seen: set[str] = set()
+        self._dirty = False
+
+    def _load(self) -> dict[str, tuple[int, int, str, Any]]:
+        if self._secret is None:
+            return {}
+        try:
+            entries = _read_signed(self.path, self._secret)
+        except FileNotFoundError:
+            return {}
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            logger.warning("Cache de arquivos invalido, ignorado: %s (%s)", self.path, exc)
+            return {}
+        if not isinstance(entries, dict) or entries.get("__version__") != __version__:
+            return {}
+        files = entries.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def lookup(self, filepath: Path) -> tuple[os.stat_result, Any | None]:
+        """Retorna o stat atual e o resultado salvo se mtime e tamanho batem."""
+        stat = filepath.stat()
+        self._seen.add(str(filepath))
+        entry = self._entries.get(str(filepath))
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return stat, entry[3]
+        return stat, None
+
+    def stale_entry(self, filepath: Path) -> tuple[str, Any] | None:
+        """(digest, resultado) salvos para filepath, sem conferir mtime e tamanho."""
+        entry = self._entries.get(str(filepath))
+        return None if entry is None else (entry[2], entry[3])
+
+    def store(self, filepath: Path, stat: os.stat_result, digest: str, value: Any) -> None:
+        """Registra o resultado; stat deve ter sido lido antes do conteudo."""
+        self._entries[str(filepath)] = (stat.st_mtime_ns, stat.st_size, digest, value)
+        self._seen.add(str(filepath))
+        self._dirty = True
+
+    def get_or_parse(self, filepath: Path, parse_fn: Callable[[str], T]) -> T:
+        """Retorna o resultado salvo para filepath ou parseia o conteudo atual."""
+        stat, value = self.lookup(filepath)
+        if value is not None:
+            return value
+
+        content = read_source(filepath)
+        digest = content_digest(content)
+        entry = self.stale_entry(filepath)
+        if entry is not None and entry[0] == digest:
+            value = entry[1]
+        else:
+            value = parse_fn(content)
+        self.store(filepath, stat, digest, value)
+        return value
 
+    def save(self) -> None:
+        """Grava as entradas atomicamente se algo mudou desde o load."""
+        unseen = self._entries.keys() - self._seen
+        if unseen:
+            for key in unseen:
+                del self._entries[key]
+            self._dirty = True
+        if not self._dirty or self._secret is None:
+            return
+        try:
+            _write_signed(
+                self.path, self._secret, {"__version__": __version__, "files": self._entries}
+            )
+        except OSError as exc:
+            logger.warning("Nao foi possivel gravar cache de arquivos: %s", exc)
+            return
+        self._dirty = False
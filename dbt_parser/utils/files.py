@@ -0,0 +1,47 @@
+"""Leitura de arquivos fonte do projeto."""
+
+import os
+from pathlib import Path
+
+def read_source(filepath: Path) -> str:
+    """Le um arquivo UTF-8 com uma leitura binaria e um decode.
+
+    Equivale a open(..., "r", encoding="utf-8").read() sem o TextIOWrapper
+    (decodificacao incremental); a traducao de quebras de linha do modo
+    texto so e aplicada quando o conteudo tem \\r.
+    """
+    with open(filepath, "rb") as f:
+        content = f.read().decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+# Diretorios na raiz do projeto dbt que nunca contem arquivos do usuario.
+SKIPPED_ROOT_DIRS = frozenset({"target", "dbt_packages", "dbt_modules", "logs", ".git"})
+
+def find_files(
+    root: Path, suffixes: tuple[str, ...], skip_root_dirs: frozenset[str] = SKIPPED_ROOT_DIRS
+) -> list[Path]:
+    """Lista recursivamente os arquivos de root com um dos sufixos, ordenados.
+
+    Uma unica varredura com os.scandir (pilha explicita, sem seguir links
+    simbolicos de diretorio); so os arquivos aceitos viram Path. Os nomes de
+    skip_root_dirs so sao ignorados logo abaixo de root (models/logs/ entra).
+    """
+    root_path = os.fspath(root)
+    found: list[str] = []
+    stack = [root_path]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if current != root_path or entry.name not in skip_root_dirs:
+                        stack.append(entry.path)
+                elif entry.name.endswith(suffixes):
+                    found.append(entry.path)
+    return sorted(Path(path) for path in found)
@@ -1,5 +1,6 @@
 """Sistema de filtragem avancada para modelos dbt."""
 
+import functools
 import logging
 import re
 from dataclasses import dataclass, field
@@ -9,6 +10,22 @@ from dbt_parser.analyzers.graph_resolver import GraphResolver
 
 logger = logging.getLogger(__name__)
 
+FILTER_PATTERN_CACHE_SIZE = 256
+SELECTOR_WILDCARDS = frozenset("*?[")
+
+@functools.lru_cache(maxsize=FILTER_PATTERN_CACHE_SIZE)
+def _compile(pattern: str) -> re.Pattern[str]:
+    """Compila uma vez cada padrao de nome usado nos filtros."""
+    return re.compile(pattern)
+
+@functools.lru_cache(maxsize=FILTER_PATTERN_CACHE_SIZE)
+def _selector_pattern(name: str) -> str:
+    """Traduz um seletor com curingas (stg_*) para regex ancorada."""
+    return "^" + name.replace("*", ".*") + "$"
+
+def _has_wildcard(name: str) -> bool:
+    return not SELECTOR_WILDCARDS.isdisjoint(name)
+
 @dataclass
 class FilterCriteria:
     """Criterios de filtragem para modelos."""
@@ -31,51 +48,44 @@ class ModelFilter:
 
     def apply_filter(self, criteria: FilterCriteria) -> set[str]:
         """Aplica filtro e retorna nomes de modelos que atendem aos criterios."""
-        result = set(self.graph.graph.nodes())
-
-        if criteria.node_types:
-            result = {
-                n for n in result
-                if self.graph.graph.nodes[n].get("node_type") in criteria.node_types
-            }
-
-        if criteria.tags:
-            result = {
-                n for n in result
-                if set(self.graph.graph.nodes[n].get("tags", [])) & criteria.tags
-            }
-
-        if criteria.name_pattern:
-            pattern = re.compile(criteria.name_pattern)
-            result = {n for n in result if pattern.search(n)}
-
-        if criteria.paths:
-            result = {
-                n for n in result
-                if any(
-                    p in (self.graph.graph.nodes[n].get("filepath") or "")
-                    for p in criteria.paths
-                )
-            }
-
-        if criteria.materializations:
-            result = {
-                n for n in result
-                if self.graph.graph.nodes[n].get("config", {}).get("materialized")
-                in criteria.materializations
-            }
-
-        if criteria.min_dependencies is not None:
-            result = {
-                n for n in result
-                if len(self.graph.get_dependencies(n)) >= criteria.min_dependencies
-            }
-
-        if criteria.max_dependencies is not None:
-            result = {
-                n for n in result
-                if len(self.graph.get_dependencies(n)) <= criteria.max_dependencies
-            }
+        node_types = criteria.node_types
+        tags = frozenset(criteria.tags) if criteria.tags else None
+        pattern = _compile(criteria.name_pattern) if criteria.name_pattern else None
+        paths = criteria.paths
+        materializations = criteria.materializations
+        min_deps = criteria.min_dependencies
+        max_deps = criteria.max_dependencies
+        # Grau de saida == numero de dependencias diretas (from depende de to).
+        out_degree = (
+            self.graph.graph.out_degree
+            if min_deps is not None or max_deps is not None
+            else None
+        )
+
+        # Uma unica passada pelos nos, avaliando todos os criterios ativos.
+        result = set()
+        for n, data in self.graph.graph.nodes(data=True):
+            if node_types and data.get("node_type") not in node_types:
+                continue
+            if tags and not any(t in tags for t in data.get("tags") or ()):
+                continue
+            if pattern is not None and not pattern.search(n):
+                continue
+            if paths:
+                filepath = data.get("filepath") or ""
+                if not any(p in filepath for p in paths):
+                    continue
+            if materializations and (
+                data.get("config", {}).get("materialized") not in materializations
+            ):
+                continue
+            if out_degree is not None:
+                degree = out_degree(n)
+                if min_deps is not None and degree < min_deps:
+                    continue
+                if max_deps is not None and degree > max_deps:
+                    continue
+            result.add(n)
 
         if criteria.exclude_names:
             result -= criteria.exclude_names
@@ -95,6 +105,10 @@ class ModelFilter:
         """
         selector = selector.strip()
 
+        if not _has_wildcard(selector) and ":" not in selector and "+" not in selector:
+            # Seletor literal: basta checar a presenca no grafo.
+            return {selector} if selector in self.graph.graph else set()
+
         if selector.startswith("tag:"):
             tag = selector[4:]
             return self.apply_filter(FilterCriteria(tags={tag}))
@@ -112,9 +126,8 @@ class ModelFilter:
         result = set()
         if name in self.graph.graph:
             result.add(name)
-        else:
-            pattern = name.replace("*", ".*")
-            matches = self.apply_filter(FilterCriteria(name_pattern=f"^{pattern}$"))
+        elif _has_wildcard(name):
+            matches = self.apply_filter(FilterCriteria(name_pattern=_selector_pattern(name)))
             result.update(matches)
 
         expanded = set(result)
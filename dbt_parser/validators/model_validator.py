@@ -18,6 +18,9 @@ class Severity(Enum):
     WARNING = "warning"
     INFO = "info"
 
+# Ordem de gravidade: menor rank e mais grave.
+SEVERITY_RANK = {Severity.ERROR: 0, Severity.WARNING: 1, Severity.INFO: 2}
+
 @dataclass
 class ValidationResult:
     """Resultado de uma validacao."""
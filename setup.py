@@ -11,6 +11,9 @@ setup(
         "networkx>=2.8",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.8",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
@@ -1,10 +1,29 @@
 """Testes para cache de resultados."""
 
+import os
+import pickle
+import threading
 import time
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from dbt_parser.utils.cache import ResultCache, CacheEntry
+from dbt_parser import __version__
+from dbt_parser.utils.cache import (
+    CacheEntry,
+    FileParseCache,
+    ParseCache,
+    ResultCache,
+    _write_signed,
+    project_cache_dir,
+    write_chunks_if_changed,
+    write_if_changed,
+)
+from dbt_parser.utils.files import find_files, read_source
+
+
+def _no_hash(filepath: Path) -> str:
+    raise AssertionError(f"conteudo lido: {filepath}")
 
 
 class TestResultCache:
@@ -46,6 +65,39 @@ class TestResultCache:
         result2 = cache.get_or_compute("key1", lambda: 99)
         assert result2 == 42
 
+    def test_get_or_compute_single_flight(self) -> None:
+        cache = ResultCache()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute() -> int:
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(cache.get_or_compute, "key", compute)
+            started.wait(5)
+            others = [pool.submit(cache.get_or_compute, "key", compute) for _ in range(3)]
+            release.set()
+            results = [first.result(5)] + [f.result(5) for f in others]
+
+        assert results == [42] * 4
+        assert len(calls) == 1
+        assert cache._inflight == {}
+
+    def test_get_or_compute_error_releases_waiters(self) -> None:
+        cache = ResultCache()
+
+        def boom() -> int:
+            raise ValueError("falhou")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("key", boom)
+        assert cache.get_or_compute("key", lambda: 7) == 7
+
     def test_stats(self) -> None:
         cache = ResultCache()
         cache.set("key1", "value")
@@ -67,3 +119,230 @@ class TestResultCache:
     def test_infinite_ttl(self) -> None:
         entry = CacheEntry(key="test", value="val", created_at=0, ttl=0)
         assert not entry.is_expired
+
+    def test_invalidate_by_file(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        cache = ResultCache()
+        cache.set("model", "parsed", file_hash=ResultCache._compute_file_hash(source))
+        assert cache.invalidate_by_file(source) == 0
+        source.write_text("select 2")
+        assert cache.invalidate_by_file(source) == 1
+        assert ResultCache._compute_file_hash(tmp_path / "missing.sql") is None
+
+    def test_invalidate_by_file_stamp(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        source = tmp_path / "model.sql"
+        other = tmp_path / "other.sql"
+        source.write_text("select 1")
+        other.write_text("select 1")
+        cache = ResultCache()
+        with monkeypatch.context() as patch:
+            patch.setattr(ResultCache, "_compute_file_hash", staticmethod(_no_hash))
+            cache.set("model", "parsed", file_hash=source)
+            cache.set("other", "parsed", file_hash=other)
+            assert cache.invalidate_by_file(source) == 0
+        # Primeiro check strict registra o hash de referencia.
+        assert cache.invalidate_by_file(source, strict=True) == 0
+
+        stat = source.stat()
+        source.write_text("select 2")
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        # Mesmo mtime e tamanho: so o modo strict percebe a mudanca.
+        assert cache.invalidate_by_file(source) == 0
+        assert cache.invalidate_by_file(source, strict=True) == 1
+        assert cache.get("other") == "parsed"
+
+    def test_invalidate_by_file_stamp_changed(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        cache = ResultCache()
+        cache.set("model", "parsed", file_hash=source)
+        source.write_text("select 10")
+        assert cache.invalidate_by_file(source) == 1
+
+    def test_reverse_index_tracks_overwrites(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        cache = ResultCache()
+        cache.set("model", "v1", file_hash="stale")
+        cache.set("model", "v2", file_hash=source)
+        cache.set("plain", "v3")
+        assert cache._by_file_hash == {}
+        source.write_text("select 10")
+        assert cache.invalidate_by_file(source) == 1
+        assert cache._by_file == {}
+        assert cache.get("plain") == "v3"
+
+
+class TestWriteIfChanged:
+    def test_skips_identical_content(self, tmp_path: Path) -> None:
+        target = tmp_path / "out" / "graph.dot"
+        assert write_if_changed(target, b"digraph {}")
+        mtime = target.stat().st_mtime_ns
+        assert not write_if_changed(target, b"digraph {}")
+        assert target.stat().st_mtime_ns == mtime
+        assert write_if_changed(target, b"digraph {a}")
+        assert target.read_bytes() == b"digraph {a}"
+
+    def test_chunks_compared_while_streaming(self, tmp_path: Path) -> None:
+        target = tmp_path / "page.html"
+        target.write_bytes(b"abcdef")
+        assert not write_chunks_if_changed(target, iter([b"ab", b"cd", b"ef"]))
+        assert write_chunks_if_changed(target, iter([b"ab", b"cX", b"ef"]))
+        assert target.read_bytes() == b"abcXef"
+        assert write_chunks_if_changed(target, iter([b"abc"]))
+        assert target.read_bytes() == b"abc"
+        assert not (tmp_path / "page.html.tmp").exists()
+
+    def test_empty_chunks_create_missing_file(self, tmp_path: Path) -> None:
+        target = tmp_path / "x"
+        assert write_chunks_if_changed(target, iter([]))
+        assert target.read_bytes() == b""
+        assert not write_chunks_if_changed(target, iter([]))
+        target.write_bytes(b"old")
+        assert write_chunks_if_changed(target, iter([]))
+        assert target.read_bytes() == b""
+
+
+class TestParseCache:
+    def test_roundtrip_and_invalidation(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        cache = ParseCache(tmp_path / ".cache")
+        key = cache.fingerprint([source])
+        assert cache.get("sql", key) is None
+        cache.put("sql", key, {"model": ["a"]})
+        assert cache.get("sql", key) == {"model": ["a"]}
+
+        source.write_text("select 1, 2")
+        new_key = cache.fingerprint([source])
+        assert new_key != key
+        cache.put("sql", new_key, {"model": ["b"]})
+        assert cache.get("sql", key) is None
+        assert len(list((tmp_path / ".cache").glob("sql-*.pickle"))) == 1
+
+    def test_corrupt_entry_ignored(self, tmp_path: Path) -> None:
+        cache = ParseCache(tmp_path)
+        (tmp_path / "yaml-abc.pickle").write_bytes(b"not a pickle")
+        assert cache.get("yaml", "abc") is None
+
+    def test_unsigned_pickle_never_loaded(self, tmp_path: Path) -> None:
+        marker = tmp_path / "executado"
+        payload = pickle.dumps(_Exploit(str(marker)))
+        (tmp_path / "yaml-abc.pickle").write_bytes(payload)
+        assert ParseCache(tmp_path).get("yaml", "abc") is None
+        assert not marker.exists()
+
+    def test_insecure_secret_disables_cache(self, tmp_path: Path) -> None:
+        cache = ParseCache(tmp_path)
+        cache.put("sql", "k", {"model": ["a"]})
+        (tmp_path / "secret").chmod(0o644)
+        reloaded = ParseCache(tmp_path)
+        assert reloaded.get("sql", "k") is None
+
+    def test_project_cache_dir_outside_project(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        project = tmp_path / "projeto"
+        cache_dir = project_cache_dir(project)
+        assert cache_dir.parent == tmp_path / "xdg" / "dbt-parser"
+        assert cache_dir != project_cache_dir(tmp_path / "outro" / "projeto")
+
+
+class _Exploit:
+    def __init__(self, marker: str) -> None:
+        self.marker = marker
+
+    def __reduce__(self):
+        return (open, (self.marker, "w"))
+
+
+class TestFileParseCache:
+    def test_reparses_only_changed_content(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        calls: list[str] = []
+
+        def parse(content: str) -> str:
+            calls.append(content)
+            return content.upper()
+
+        cache = FileParseCache(tmp_path / "files-sql.pickle")
+        assert cache.get_or_parse(source, parse) == "SELECT 1"
+        cache.save()
+
+        reloaded = FileParseCache(tmp_path / "files-sql.pickle")
+        assert reloaded.get_or_parse(source, parse) == "SELECT 1"
+        os.utime(source, ns=(0, 0))
+        assert reloaded.get_or_parse(source, parse) == "SELECT 1"
+        assert calls == ["select 1"]
+
+        source.write_text("select 2")
+        assert reloaded.get_or_parse(source, parse) == "SELECT 2"
+        assert calls == ["select 1", "select 2"]
+
+    def test_corrupt_file_ignored(self, tmp_path: Path) -> None:
+        (tmp_path / "files-sql.pickle").write_bytes(b"not a pickle")
+        source = tmp_path / "model.sql"
+        source.write_text("select 1")
+        cache = FileParseCache(tmp_path / "files-sql.pickle")
+        assert cache.get_or_parse(source, str.upper) == "SELECT 1"
+
+    def test_unsigned_pickle_never_loaded(self, tmp_path: Path) -> None:
+        marker = tmp_path / "executado"
+        (tmp_path / "files-sql.pickle").write_bytes(pickle.dumps(_Exploit(str(marker))))
+        FileParseCache(tmp_path / "files-sql.pickle")
+        assert not marker.exists()
+
+    def test_save_prunes_files_not_seen(self, tmp_path: Path) -> None:
+        kept = tmp_path / "kept.sql"
+        removed = tmp_path / "removed.sql"
+        kept.write_text("select 1")
+        removed.write_text("select 2")
+        cache = FileParseCache(tmp_path / "files-sql.pickle")
+        cache.get_or_parse(kept, str.upper)
+        cache.get_or_parse(removed, str.upper)
+        cache.save()
+
+        removed.unlink()
+        reloaded = FileParseCache(tmp_path / "files-sql.pickle")
+        assert reloaded.get_or_parse(kept, str.upper) == "SELECT 1"
+        reloaded.save()
+        assert set(FileParseCache(tmp_path / "files-sql.pickle")._entries) == {str(kept)}
+
+    def test_payload_without_files_is_empty(self, tmp_path: Path) -> None:
+        cache = FileParseCache(tmp_path / "files-sql.pickle")
+        _write_signed(cache.path, cache._secret, {"__version__": __version__})
+        assert FileParseCache(tmp_path / "files-sql.pickle")._entries == {}
+
+
+class TestReadSource:
+    def test_matches_text_mode_read(self, tmp_path: Path) -> None:
+        source = tmp_path / "model.sql"
+        source.write_bytes("select 'á'\r\nfrom t\rwhere 1\n".encode("utf-8"))
+        with open(source, "r", encoding="utf-8") as f:
+            assert read_source(source) == f.read()
+
+
+class TestFindFiles:
+    def test_walks_tree_and_skips_root_artifacts(self, tmp_path: Path) -> None:
+        for rel in (
+            "dbt_project.yml",
+            "models/schema.yml",
+            "models/logs/events.yaml",
+            "models/model.sql",
+            "target/compiled.yml",
+            "dbt_packages/pkg/schema.yml",
+        ):
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("x")
+        found = find_files(tmp_path, (".yml", ".yaml"))
+        assert found == [
+            tmp_path / "dbt_project.yml",
+            tmp_path / "models" / "logs" / "events.yaml",
+            tmp_path / "models" / "schema.yml",
+        ]
@@ -7,7 +7,7 @@ pytest.importorskip("networkx", reason="networkx indisponivel (falta _bz2)")
 
 from dbt_parser.parsers.sql_parser import SqlParser
 from dbt_parser.analyzers.graph_resolver import GraphResolver, NodeInfo
-from dbt_parser.analyzers.complexity_metrics import ComplexityMetrics, ModelComplexity
+from dbt_parser.analyzers.complexity_metrics import ComplexityMetrics, ModelComplexity, _scan_sql
 
 
 @pytest.fixture
@@ -74,3 +74,74 @@ class TestComplexityMetrics:
     def test_nonexistent_model(self, metrics: ComplexityMetrics) -> None:
         result = metrics.calculate_model_complexity("nonexistent")
         assert result.complexity_score == 0.0
+
+    def test_complex_model_counts(self, metrics: ComplexityMetrics) -> None:
+        result = metrics.calculate_model_complexity("complex_model")
+        assert result.join_count == 2
+        assert result.cte_count == 3
+        assert result.jinja_block_count == 4
+
+    def test_scan_sql_skips_comments_and_strings(self) -> None:
+        sql = "select 'a join (b'\n\n-- left join c\nfrom x join y on (x.id = y.id)"
+        lines, joins, parens, expressions, statements = _scan_sql(sql)
+        assert lines == 3
+        assert joins == 1
+        assert parens == 1
+        assert expressions == 0
+        assert statements == 0
+
+    def test_scan_sql_jinja_comment_apostrophe(self) -> None:
+        sql = (
+            "{# this model doesn't filter #}\n"
+            "select a.id\n"
+            "from {{ ref('a') }} a\n"
+            "join {{ ref('b') }} b on (a.id = b.id)\n"
+            "left join c on (c.id = a.id)\n"
+            "where a.x = 'y'"
+        )
+        assert _scan_sql(sql) == (6, 2, 4, 2, 0)
+
+    def test_scan_sql_counts_lines_inside_block_comment(self) -> None:
+        sql = "select 1\n/* primeira\n\n   segunda\n*/\nfrom x"
+        lines, joins, parens, _, _ = _scan_sql(sql)
+        assert lines == 5
+        assert (joins, parens) == (0, 0)
+
+    def test_calculate_all_cached_until_change(self, metrics: ComplexityMetrics) -> None:
+        first = metrics.calculate_all()
+        assert [m.model_name for m in metrics.calculate_all()] == [m.model_name for m in first]
+        assert metrics._ranked() is metrics._ranked()
+
+        first[0].complexity_score = -1.0
+        assert metrics.calculate_all()[0].complexity_score != -1.0
+        assert metrics.calculate_all()[0] == metrics._ranked()[0]
+
+        metrics.graph.add_edge("simple_model", "complex_model")
+        simple = {m.model_name: m for m in metrics.calculate_all()}["simple_model"]
+        assert simple.dependency_depth == 1
+
+        models_dir = metrics.sql_parser.project_dir / "models"
+        (models_dir / "extra_model.sql").write_text("select 1")
+        metrics.sql_parser.parse_file(models_dir / "extra_model.sql")
+        assert len(metrics.calculate_all()) == 3
+
+    def test_calculate_all_matches_single_model(self, tmp_path: Path) -> None:
+        models_dir = tmp_path / "many" / "models"
+        models_dir.mkdir(parents=True)
+        for i in range(40):
+            joins = " join t on a = b" * (i % 4)
+            (models_dir / f"m{i}.sql").write_text(f"select * from (select {i}) x{joins}")
+        sql_parser = SqlParser(tmp_path / "many")
+        sql_parser.parse_all()
+        graph = GraphResolver()
+        for i in range(1, 40):
+            graph.add_edge(f"m{i}", f"m{i - 1}")
+        metrics = ComplexityMetrics(sql_parser, graph)
+
+        batch = {m.model_name: m for m in metrics.calculate_all()}
+        single = {name: metrics.calculate_model_complexity(name) for name in sql_parser._parsed_models}
+        assert batch == single
+
+    def test_score_is_weighted_sum(self, metrics: ComplexityMetrics) -> None:
+        m = ModelComplexity(model_name="x", sql_lines=10, join_count=2, subquery_count=1, dependents_count=3)
+        assert metrics._calculate_score(m) == round(10 * 0.1 + 2 * 2.0 + 1 * 3.0 + 3 * 0.5, 2)
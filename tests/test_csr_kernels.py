@@ -0,0 +1,19 @@
+"""Testes para os kernels CSR."""
+
+from dbt_parser.analyzers.csr_kernels import bfs_order, build_csr
+
+
+def _encode(adjacency: dict[str, list[str]]):
+    id_of = {name: idx for idx, name in enumerate(adjacency)}
+    return id_of, build_csr(id_of, adjacency)
+
+
+class TestCsrKernels:
+    def test_build_csr(self) -> None:
+        _, (indptr, indices) = _encode({"a": ["b", "c"], "b": ["c"], "c": []})
+        assert list(indptr) == [0, 2, 3, 3]
+        assert list(indices) == [1, 2, 2]
+
+    def test_bfs_order_handles_cycles(self) -> None:
+        _, (indptr, indices) = _encode({"a": ["b"], "b": ["c", "a"], "c": ["d"], "d": []})
+        assert bfs_order(indptr, indices, 0) == [1, 2, 3]
@@ -61,3 +61,18 @@ class TestDependencyAnalyzer:
     def test_isolated_models(self, analyzer: DependencyAnalyzer) -> None:
         isolated = analyzer.get_isolated_models()
         assert isinstance(isolated, set)
+
+    def test_most_dependencies_counts(self, analyzer: DependencyAnalyzer) -> None:
+        result = analyzer.get_most_dependencies(1)
+        assert result == [("fct_event_dates", 2)]
+
+    def test_isolated_models_detects_lonely_node(self, analyzer: DependencyAnalyzer) -> None:
+        analyzer.graph.add_node(NodeInfo(name="orphan", node_type="model"))
+        assert analyzer.get_isolated_models() == {"orphan"}
+
+    def test_analyze_all_root_and_leaf_flags(self, analyzer: DependencyAnalyzer) -> None:
+        reports = {r.model_name: r for r in analyzer.analyze_all()}
+        assert reports["raw.events"].is_root
+        assert not reports["raw.events"].is_leaf
+        assert reports["fct_event_dates"].is_leaf
+        assert reports["fct_event_dates"] == analyzer.analyze_model("fct_event_dates")
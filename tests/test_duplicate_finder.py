@@ -55,3 +55,84 @@ class TestDuplicateFinder:
     def test_get_summary(self, finder: DuplicateFinder) -> None:
         summary = finder.get_duplicate_summary()
         assert "duplicate_cte_names" in summary
+
+    def test_similar_models_grouped(self, finder: DuplicateFinder) -> None:
+        similar = finder.find_similar_models(threshold=0.5)
+        grouped = [set(g.models) for g in similar]
+        assert {"model_a", "model_b"} in grouped
+        assert all("model_c" not in g for g in grouped)
+
+    def test_candidate_pairs_do_not_miss_similar_sets(self) -> None:
+        token_sets = {
+            "a": frozenset("select a b c from x".split()),
+            "b": frozenset("select a b d from x".split()),
+            "c": frozenset("insert into y values z".split()),
+            "d": frozenset("select a b c from x where".split()),
+        }
+        threshold = 0.6
+        candidates = DuplicateFinder._find_candidate_pairs(token_sets, threshold)
+        for n1, t1 in token_sets.items():
+            for n2, t2 in token_sets.items():
+                if n1 != n2 and len(t1 & t2) / len(t1 | t2) >= threshold:
+                    assert n2 in candidates[n1]
+        assert "c" not in candidates["a"]
+
+    def test_duplicate_configs_grouped(self, tmp_path: Path) -> None:
+        models_dir = tmp_path / "models"
+        models_dir.mkdir()
+        config = "{{ config(materialized='table', schema='marts') }}\nselect 1"
+        (models_dir / "m1.sql").write_text(config)
+        (models_dir / "m2.sql").write_text(config)
+        (models_dir / "m3.sql").write_text("{{ config(materialized='view') }}\nselect 1")
+        parser = SqlParser(tmp_path)
+        parser.parse_all()
+
+        dupes = DuplicateFinder(parser).find_duplicate_configs()
+        assert list(dupes.values()) == [["m1", "m2"]]
+        assert list(dupes) == [str(sorted({"materialized": "table", "schema": "marts"}.items()))]
+
+    def test_normalized_sql_cached(self, finder: DuplicateFinder) -> None:
+        first = finder.find_similar_models(threshold=0.5)
+        assert len(finder._norm_cache) == 3
+        second = finder.find_similar_models(threshold=0.5)
+        assert [g.pattern_hash for g in first] == [g.pattern_hash for g in second]
+        assert all(len(g.pattern_hash) == 8 for g in first)
+
+    def test_length_bound_prunes_unreachable_pairs(self) -> None:
+        assert DuplicateFinder._below_length_bound(2, 10, 0.5)
+        assert not DuplicateFinder._below_length_bound(5, 10, 0.5)
+        assert not DuplicateFinder._below_length_bound(3, 10, 0.3)
+
+    def test_summary_matches_individual_finders(self, finder: DuplicateFinder) -> None:
+        summary = finder.get_duplicate_summary()
+        assert summary["duplicate_cte_names"] == len(finder.find_duplicate_ctes())
+        assert summary["similar_model_groups"] == len(finder.find_similar_models())
+        assert summary["duplicate_config_groups"] == len(finder.find_duplicate_configs())
+
+    def test_similar_models_grouped_transitively(self, tmp_path: Path) -> None:
+        models_dir = tmp_path / "models"
+        models_dir.mkdir()
+        (models_dir / "m1.sql").write_text("select a, b, c from x")
+        (models_dir / "m2.sql").write_text("select a, b, d from x")
+        (models_dir / "m3.sql").write_text("select a, e, d from x")
+        parser = SqlParser(tmp_path)
+        parser.parse_all()
+
+        similar = DuplicateFinder(parser).find_similar_models(threshold=0.7)
+        assert [g.models for g in similar] == [["m1", "m2", "m3"]]
+
+    def test_exact_copies_short_circuit(self, tmp_path: Path) -> None:
+        models_dir = tmp_path / "models"
+        models_dir.mkdir()
+        (models_dir / "m1.sql").write_text("select a, b from x where id = 1")
+        (models_dir / "m2.sql").write_text("-- copia\nselect a, b from x where id = 2")
+        (models_dir / "m3.sql").write_text("select a, b from x where id = 3 and c")
+        (models_dir / "m4.sql").write_text("insert into y values (z)")
+        parser = SqlParser(tmp_path)
+        parser.parse_all()
+
+        finder = DuplicateFinder(parser)
+        exact = finder.find_similar_models(threshold=0.95)
+        assert [(g.models, g.similarity_score) for g in exact] == [(["m1", "m2"], 1.0)]
+        fuzzy = finder.find_similar_models(threshold=0.7)
+        assert [(g.models, g.similarity_score) for g in fuzzy] == [(["m1", "m2", "m3"], 0.7)]
@@ -46,6 +46,45 @@ class TestJsonExporter:
         content = json.loads(filepath.read_text())
         assert len(content["nodes"]) == 3
 
+    def test_export_special_types(self, tmp_path: Path) -> None:
+        exporter = JsonExporter()
+        data = {"tags": {"b", "a"}, "path": Path("models/x.sql"), "name": "modelo_ção"}
+        filepath = tmp_path / "special.json"
+        exporter.export_to_file(data, filepath)
+        expected = {"tags": ["a", "b"], "path": "models/x.sql", "name": "modelo_ção"}
+        assert json.loads(filepath.read_text(encoding="utf-8")) == expected
+        assert json.loads(exporter.export_to_string(data)) == expected
+
+    def test_orjson_and_stdlib_files_match(
+        self, graph: GraphResolver, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        pytest.importorskip("orjson")
+        from dbt_parser.exporters import json_exporter
+
+        exporter = JsonExporter()
+        data = {
+            "graph": exporter.export_graph(graph),
+            "tags": frozenset({"b", "a"}),
+            "path": Path("models/x.sql"),
+            "name": "modelo_ção",
+            "score": 12.75,
+            "counts": {1: 2, "empty": [], "nested": {}},
+        }
+        fast_file = tmp_path / "orjson.json"
+        exporter.export_to_file(data, fast_file)
+        monkeypatch.setattr(json_exporter, "JSON_BACKEND", "json")
+        slow_file = tmp_path / "stdlib.json"
+        exporter.export_to_file(data, slow_file)
+        assert fast_file.read_bytes() == slow_file.read_bytes()
+
+    def test_orjson_falls_back_on_big_int(self, tmp_path: Path) -> None:
+        exporter = JsonExporter()
+        filepath = tmp_path / "big.json"
+        exporter.export_to_file({"n": 2**70}, filepath)
+        assert json.loads(filepath.read_text()) == {"n": 2**70}
+        assert exporter.export_to_string({"a": 1}) == '{\n  "a": 1\n}'
+        assert JsonExporter(indent=None).export_to_string({"a": 1}) == '{"a": 1}'
+
 
 class TestGraphvizExporter:
     def test_to_dot(self, graph: GraphResolver) -> None:
@@ -70,6 +109,26 @@ class TestGraphvizExporter:
         exporter.export_to_file(filepath)
         assert filepath.exists()
 
+    def test_streamed_file_matches_to_dot(self, graph: GraphResolver, tmp_path: Path) -> None:
+        exporter = GraphvizExporter(graph)
+        filepath = tmp_path / "graph.dot"
+        exporter.export_to_file(filepath, highlight_nodes={"stg_events"})
+        assert filepath.read_text(encoding="utf-8") == exporter.to_dot(
+            highlight_nodes={"stg_events"}
+        )
+        mtime = filepath.stat().st_mtime_ns
+        exporter.export_to_file(filepath, highlight_nodes={"stg_events"})
+        assert filepath.stat().st_mtime_ns == mtime
+
+    def test_dot_subgraph_cached_until_graph_changes(self, graph: GraphResolver) -> None:
+        exporter = GraphvizExporter(graph)
+        nodes = {"stg_events", "fct_events", "raw.events"}
+        dot = exporter.to_dot_subgraph(nodes)
+        assert exporter.to_dot_subgraph(set(nodes)) is dot
+        graph.add_edge("fct_events", "raw.events")
+        assert '"fct_events" -> "raw_events"' not in dot
+        assert '"fct_events" -> "raw_events"' in exporter.to_dot_subgraph(nodes)
+
 
 class TestMermaidExporter:
     def test_to_mermaid(self, graph: GraphResolver) -> None:
@@ -97,3 +156,22 @@ class TestMermaidExporter:
         filepath = tmp_path / "graph.mmd"
         exporter.export_to_file(filepath)
         assert filepath.exists()
+
+    def test_streamed_file_matches_to_mermaid(self, graph: GraphResolver, tmp_path: Path) -> None:
+        exporter = MermaidExporter(graph)
+        filepath = tmp_path / "graph.mmd"
+        exporter.export_to_file(filepath, title="T", highlight_nodes={"stg_events"})
+        assert filepath.read_text(encoding="utf-8") == exporter.to_mermaid(
+            title="T", highlight_nodes={"stg_events"}
+        )
+
+
+class TestLazyExports:
+    def test_package_attributes_resolve_to_classes(self) -> None:
+        import dbt_parser.exporters as exporters
+
+        assert exporters.JsonExporter is JsonExporter
+        assert exporters.MermaidExporter is MermaidExporter
+        assert set(exporters.__all__) <= set(dir(exporters))
+        with pytest.raises(AttributeError):
+            exporters.Missing
@@ -58,3 +58,27 @@ class TestModelFilter:
         ]
         result = model_filter.filter_chain(criteria)
         assert len(result) == 2
+
+    def test_selector_wildcard_reuses_compiled_pattern(self, model_filter: ModelFilter) -> None:
+        from dbt_parser.utils import filtering
+
+        assert model_filter.filter_by_selector("stg_*") == {"stg_events", "stg_dates"}
+        hits = filtering._compile.cache_info().hits
+        assert model_filter.filter_by_selector("stg_*") == {"stg_events", "stg_dates"}
+        assert filtering._compile.cache_info().hits == hits + 1
+
+    def test_selector_literal(self, model_filter: ModelFilter) -> None:
+        assert model_filter.filter_by_selector("stg_events") == {"stg_events"}
+        assert model_filter.filter_by_selector("raw_events") == set()
+        assert model_filter.filter_by_selector("missing+") == set()
+
+    def test_filter_combined_criteria(self, model_filter: ModelFilter) -> None:
+        criteria = FilterCriteria(
+            node_types={"model"},
+            tags={"staging"},
+            name_pattern=r"events",
+            min_dependencies=1,
+            max_dependencies=1,
+        )
+        assert model_filter.apply_filter(criteria) == {"stg_events"}
+        assert model_filter.apply_filter(FilterCriteria(min_dependencies=2)) == {"fct_final"}
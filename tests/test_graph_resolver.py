@@ -102,3 +102,48 @@ class TestGraphResolver:
     def test_upstream_nonexistent(self, graph: GraphResolver) -> None:
         upstream = graph.get_all_upstream("nonexistent")
         assert upstream == set()
+
+    def test_upstream_cache_invalidated_on_add_edge(self, graph: GraphResolver) -> None:
+        assert graph.get_all_upstream("stg_events") == {"raw.events"}
+        graph.add_node(NodeInfo(name="raw.extra", node_type="source"))
+        graph.add_edge("stg_events", "raw.extra")
+        assert graph.get_all_upstream("stg_events") == {"raw.events", "raw.extra"}
+        assert "fct_event_dates" in graph.get_all_downstream("raw.extra")
+
+    def test_closure_with_cycle_matches_networkx(self) -> None:
+        import networkx as nx
+
+        g = GraphResolver()
+        for name in ("a", "b", "c", "d"):
+            g.add_node(NodeInfo(name=name, node_type="model"))
+        g.add_edge("a", "b")
+        g.add_edge("b", "c")
+        g.add_edge("c", "b")
+        g.add_edge("c", "d")
+        for name in ("a", "b", "c", "d"):
+            assert g.get_all_upstream(name) == nx.descendants(g.graph, name)
+            assert g.get_all_downstream(name) == nx.ancestors(g.graph, name)
+
+    def test_upstream_and_downstream_count(self, graph: GraphResolver) -> None:
+        assert graph.upstream_count("fct_event_dates") == 4
+        assert graph.downstream_count("raw.events") == 2
+        assert graph.downstream_count("nonexistent") == 0
+
+    def test_bulk_add_matches_single_add(self, graph: GraphResolver) -> None:
+        upstream_before = graph.get_all_upstream("fct_orders")
+        g = GraphResolver()
+        g.add_nodes(graph.get_node_info(name) for name in graph.graph.nodes)
+        g.add_edges(graph.graph.edges)
+        assert list(g.graph.nodes(data=True)) == list(graph.graph.nodes(data=True))
+        assert g.get_all_upstream("fct_orders") == upstream_before
+        g.add_edges([("fct_orders", "new_source")])
+        assert "new_source" in g.get_all_upstream("fct_orders")
+
+    def test_sorted_views_reused_until_mutation(self, graph: GraphResolver) -> None:
+        nodes = graph.sorted_nodes()
+        assert nodes == tuple(sorted(graph.graph.nodes()))
+        assert graph.sorted_nodes() is nodes
+        assert graph.sorted_edges() is graph.sorted_edges()
+        graph.add_edge("aaa_model", "stg_events")
+        assert graph.sorted_nodes()[0] == "aaa_model"
+        assert ("aaa_model", "stg_events") in graph.sorted_edges()
@@ -123,6 +123,38 @@ class TestHtmlExporter:
         assert stats["model"] == 3
         assert stats["source"] == 1
 
+    def test_extract_counts_types_in_same_pass(self, sample_graph):
+        from dbt_parser.exporters.html_exporter import HtmlExporter
+
+        exporter = HtmlExporter(sample_graph)
+        nodes, type_counts = exporter._extract()
+        assert type_counts == {"model": 3, "source": 1}
+        assert exporter._calculate_stats(nodes, [], type_counts) == exporter._calculate_stats(
+            nodes, []
+        )
+
+    def test_extract_all_matches_helpers(self, sample_graph):
+        from dbt_parser.exporters.html_exporter import HtmlExporter
+
+        exporter = HtmlExporter(sample_graph)
+        nodes, edges, stats = exporter._extract_all()
+        assert nodes == exporter._extract_nodes()
+        assert edges == exporter._extract_edges()
+        assert stats == exporter._calculate_stats(nodes, edges)
+
+    def test_build_indexes(self):
+        from dbt_parser.exporters.html_exporter import HtmlExporter
+
+        nodes = [
+            {"id": "stg_Users", "type": "model", "filepath": "", "tags": ("PII",)},
+            {"id": "raw.users", "type": "source", "filepath": "", "tags": ()},
+            {"id": "fct_orders", "type": "model", "filepath": "", "tags": ()},
+        ]
+        node_index, type_index, corpus = HtmlExporter._build_indexes(nodes)
+        assert node_index == {"stg_Users": 0, "raw.users": 1, "fct_orders": 2}
+        assert type_index == {"model": [0, 2], "source": [1]}
+        assert corpus == ["stg_users\npii", "raw.users", "fct_orders"]
+
     def test_html_escapes_title(self, sample_graph):
         from dbt_parser.exporters.html_exporter import HtmlExporter
 
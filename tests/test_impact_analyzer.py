@@ -53,3 +53,11 @@ class TestImpactAnalyzer:
         summary = impact.get_impact_summary()
         assert "total_nodes" in summary
         assert summary["total_nodes"] == 5
+
+    def test_find_high_impact_sorted_by_count(self, impact: ImpactAnalyzer) -> None:
+        results = impact.find_high_impact_models(threshold=2)
+        assert results == [("raw.events", 3), ("stg_events", 2)]
+
+    def test_impact_summary_highest(self, impact: ImpactAnalyzer) -> None:
+        summary = impact.get_impact_summary()
+        assert summary["highest_impact"] == ("raw.events", 3)
@@ -1,5 +1,6 @@
 """Testes para jinja parser."""
 
+import dataclasses
 import pytest
 
 from dbt_parser.parsers.jinja_parser import JinjaParser, JinjaBlock, JinjaAnalysis
@@ -86,3 +87,29 @@ class TestJinjaParser:
         parser.parse_content("select {{ var('other_var') }}", "test2.sql")
         all_vars = parser.get_all_variables()
         assert len(all_vars) >= 1
+
+    def test_blocks_in_document_order(self, parser: JinjaParser) -> None:
+        analysis = parser.parse_content("{# c #}{{ a }}{% set x = 1 %}{{ b }}")
+        assert [b.block_type for b in analysis.blocks] == [
+            "comment",
+            "expression",
+            "statement",
+            "expression",
+        ]
+
+    def test_filters_and_vars_only_inside_jinja(self, parser: JinjaParser) -> None:
+        content = "select a || b {# var('ignored') #} from {{ t | upper }}"
+        analysis = parser.parse_content(content)
+        assert analysis.filters_used == {"upper"}
+        assert analysis.variables == set()
+
+    def test_repeated_content_reuses_scan(self, parser: JinjaParser) -> None:
+        content = "select {{ var('x') | upper }} {% if true %}1{% endif %}"
+        first = parser.parse_content(content, "a.sql")
+        second = parser.parse_content(content, "b.sql")
+        assert parser._scan(content) is parser._scan(content)
+        assert (first.filepath, second.filepath) == ("a.sql", "b.sql")
+        assert first.blocks == second.blocks and first.blocks is not second.blocks
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first.blocks[0].content = "mutado"
+        assert parser.get_jinja_complexity(content)["if_blocks"] == 1
@@ -1,5 +1,6 @@
 """Testes para lineage tracker."""
 
+import sys
 import pytest
 
 pytest.importorskip("networkx", reason="networkx indisponivel (falta _bz2)")
@@ -68,3 +69,100 @@ class TestLineageTracker:
         assert summary["total_entries"] == 2
         assert summary["ref_entries"] == 1
         assert summary["source_entries"] == 1
+
+    def test_column_upstream_and_downstream(self, tracker: LineageTracker) -> None:
+        tracker.track_column_transformation("stg_events", "event_id", "raw_events", ["id"])
+        tracker.track_column_transformation("fct_event_dates", "event_id", "stg_events", ["event_id"])
+        assert tracker.get_column_upstream("fct_event_dates", "event_id") == [
+            "stg_events.event_id",
+            "raw_events.id",
+        ]
+        assert tracker.get_column_downstream("raw_events", "id") == [
+            "stg_events.event_id",
+            "fct_event_dates.event_id",
+        ]
+
+        tracker.track_column_transformation("raw_events", "id", "landing", ["event_key"])
+        assert "landing.event_key" in tracker.get_column_upstream("fct_event_dates", "event_id")
+
+    def test_column_traversal_survives_cycles(self, tracker: LineageTracker) -> None:
+        tracker.track_column_transformation("a", "x", "b", ["x"])
+        tracker.track_column_transformation("b", "x", "a", ["x"])
+        assert tracker.get_column_upstream("a", "x") == ["b.x"]
+        assert tracker.get_column_downstream("a", "x") == ["b.x"]
+
+    def test_get_data_flow_path(self, tracker: LineageTracker) -> None:
+        paths = tracker.get_data_flow_path("raw.events", "fct_event_dates")
+        assert paths == [["fct_event_dates", "stg_events", "raw.events"]]
+        assert tracker.get_data_flow_path("raw.events", "fct_event_dates", cutoff=1) == []
+        assert tracker.get_data_flow_path("raw.dates", "stg_events") == []
+        assert tracker.get_data_flow_path("missing", "stg_events") == []
+
+    def test_lineage_depth_cached_until_graph_changes(self, tracker: LineageTracker) -> None:
+        assert tracker.get_full_lineage("raw.events")["lineage_depth_down"] == 2
+        assert tracker._depth_cache[("raw.events", "down")] == 2
+        tracker.graph_resolver.add_edge("report", "fct_event_dates")
+        assert tracker.get_full_lineage("raw.events")["lineage_depth_down"] == 3
+        assert tracker.get_full_lineage("report")["lineage_depth_up"] == 3
+
+    def test_data_flow_paths_and_depths(self, tracker: LineageTracker) -> None:
+        paths = tracker.get_data_flow_path("raw.events", "fct_event_dates")
+        assert paths == [["fct_event_dates", "stg_events", "raw.events"]]
+        assert tracker.get_data_flow_path("raw.events", "fct_event_dates", cutoff=1) == []
+        lineage = tracker.get_full_lineage("fct_event_dates")
+        assert lineage["lineage_depth_up"] == 2
+        assert lineage["lineage_depth_down"] == 0
+
+    def test_lineage_entries_indexed_by_model(self, tracker: LineageTracker) -> None:
+        ref = tracker.track_ref_lineage("fct_event_dates", "stg_events")
+        source = tracker.track_source_lineage("stg_events", "raw", "events")
+        assert tracker.get_lineage_entries("stg_events") == [ref, source]
+        assert tracker.get_lineage_entries("raw.events") == [source]
+        assert tracker.get_lineage_entries("unknown") == []
+
+    def test_data_flow_path_limited_by_max_paths(
+        self, tracker: LineageTracker, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        tracker.graph_resolver.add_edge("fct_event_dates", "raw.events")
+        assert len(tracker.get_data_flow_path("raw.events", "fct_event_dates")) == 2
+        assert "truncados" not in caplog.text
+        assert tracker.get_data_flow_path("raw.events", "fct_event_dates", max_paths=1) == [
+            ["fct_event_dates", "stg_events", "raw.events"]
+        ]
+        assert "truncados" in caplog.text
+
+    def test_lineage_names_are_interned(self, tracker: LineageTracker) -> None:
+        name = "".join(["stg_", "events"])
+        entry = tracker.track_ref_lineage("fct_event_dates", name)
+        assert entry.source_node is sys.intern("stg_events")
+        tracker.track_column_transformation("fct_event_dates", "event_id", name, ["event_id"])
+        model, column = next(k for k in tracker._column_lineage if k == ("fct_event_dates", "event_id"))
+        assert model is sys.intern("fct_event_dates")
+        assert column is sys.intern("event_id")
+
+    def test_column_lineage_shares_single_store(self, tracker: LineageTracker) -> None:
+        tracker.track_column_lineage("stg", "id", ["raw.id"])
+        tracker.track_column_transformation("fct", "id", "stg", ["id"])
+        assert tracker.get_column_lineage("stg") == {"id": ["raw.id"]}
+        assert tracker.get_column_lineage("fct") == {"id": ["stg.id"]}
+        assert tracker.get_column_upstream("fct", "id") == ["stg.id", "raw.id"]
+        tracker.track_column_lineage("stg", "id", ["raw.event_id"])
+        assert tracker.get_column_upstream("fct", "id") == ["stg.id", "raw.event_id"]
+        assert tracker.get_column_downstream("raw", "id") == []
+
+    def test_lineage_entries_view_refreshed_on_insert(self, tracker: LineageTracker) -> None:
+        tracker.track_ref_lineage("fct_event_dates", "stg_events")
+        view = tracker.get_lineage_entries(copy=False)
+        assert tracker.get_lineage_entries(copy=False) is view
+        tracker.track_ref_lineage("fct_event_dates", "stg_dates")
+        assert len(tracker.get_lineage_entries(copy=False)) == 2
+        assert len(view) == 1
+
+    def test_column_lineage_graph_downstream(self, tracker: LineageTracker) -> None:
+        tracker.track_column_transformation("stg", "id", "raw", ["id"])
+        tracker.track_column_transformation("fct", "id", "stg", ["id"])
+        tracker.track_column_transformation("stg", "id", "fct", ["id"])
+        graph = tracker.get_column_lineage_graph()
+        assert graph["stg.id"]["upstream"] == ["raw.id", "fct.id"]
+        assert graph["stg.id"]["downstream"] == ["fct.id"]
+        assert graph["fct.id"]["downstream"] == ["stg.id"]
@@ -74,3 +74,11 @@ class TestMacroExpander:
         exp = MacroExpander(tmp_path)
         files = exp.find_macro_files()
         assert files == []
+
+    def test_parallel_parse_matches_serial(
+        self, expander: MacroExpander, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("dbt_parser.utils.parallel.PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr("dbt_parser.utils.parallel.os.cpu_count", lambda: 2)
+        parallel = MacroExpander(expander.project_dir).parse_all_macros(jobs=2)
+        assert parallel == expander.get_all_macros()
@@ -1,5 +1,6 @@
 """Testes para ref resolver."""
 
+import dataclasses
 import pytest
 import yaml
 from pathlib import Path
@@ -7,7 +8,7 @@ from pathlib import Path
 from dbt_parser.parsers.yaml_parser import YamlParser
 from dbt_parser.parsers.sql_parser import SqlParser
 from dbt_parser.parsers.schema_extractor import SchemaExtractor
-from dbt_parser.analyzers.ref_resolver import RefResolver
+from dbt_parser.analyzers.ref_resolver import RefResolver, ResolvedRef
 
 
 @pytest.fixture
@@ -81,3 +82,37 @@ class TestRefResolver:
         resolver.resolve_all()
         resolved = resolver.get_resolved()
         assert len(resolved) > 0
+
+    def test_resolved_ref_is_frozen_and_hashable(self) -> None:
+        ref = ResolvedRef(source_model="a", target_model="b", ref_type="ref")
+        assert ref in {ResolvedRef(source_model="a", target_model="b", ref_type="ref")}
+        assert not hasattr(ref, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            ref.resolved = False
+
+    def test_known_sets_rebuilt_after_new_schema(self, resolver: RefResolver) -> None:
+        models, sources = resolver._build_known_sets()
+        assert resolver._build_known_sets()[0] is models
+        assert ("raw", "events") in sources
+
+        resolver.schema_extractor.extract_models({"models": [{"name": "missing_model"}]})
+        _, unresolved = resolver.resolve_all()
+        assert unresolved == []
+
+    def test_unresolved_refs_logged_once(
+        self, resolver: RefResolver, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        with caplog.at_level("WARNING", logger="dbt_parser.analyzers.ref_resolver"):
+            resolver.resolve_all()
+        warnings = [r for r in caplog.records if r.levelname == "WARNING"]
+        assert len(warnings) == 1
+        assert "fct_final -> 'missing_model'" in warnings[0].getMessage()
+
+    def test_read_only_views_cached_until_resolve(self, resolver: RefResolver) -> None:
+        resolver.resolve_all()
+        view = resolver.get_unresolved(copy=False)
+        assert isinstance(view, tuple)
+        assert resolver.get_unresolved(copy=False) is view
+        assert list(view) == resolver.get_unresolved()
+        resolver.resolve_all()
+        assert resolver.get_unresolved(copy=False) is not view
@@ -1,11 +1,13 @@
 """Testes para o parser SQL."""
 
+import os
 import tempfile
 from pathlib import Path
 
 import pytest
 
 from dbt_parser.parsers.sql_parser import SqlParser
+from dbt_parser.utils.cache import FileParseCache
 
 
 @pytest.fixture
@@ -99,6 +101,14 @@ class TestSqlParser:
         assert model is not None
         assert ("raw", "events") in model.sources
 
+    def test_repeated_refs_are_deduplicated(self) -> None:
+        content = (
+            "select * from {{ ref('b') }} join {{ ref('a') }} join {{ ref('b') }}"
+            " join {{ source('raw', 'x') }} join {{ source('raw', 'x') }}"
+        )
+        assert SqlParser._extract_refs(content) == ["b", "a"]
+        assert SqlParser._extract_sources(content) == [("raw", "x")]
+
     def test_parse_config(self, tmp_dbt_project: Path) -> None:
         parser = SqlParser(tmp_dbt_project)
         parser.parse_all()
@@ -113,6 +123,17 @@ class TestSqlParser:
         assert model is not None
         assert "events" in model.ctes or "joined" in model.ctes
 
+    def test_ctes_ignore_strings_comments_and_aliases(self) -> None:
+        content = """{{ config(materialized='table') }}
+with recursive base as (
+    select cast(a as int) as a, 'with fake as (' as s  -- with other as (
+    from (with nested as (select 1 as a) select * from nested) sub
+),
+final (a, s) as materialized (select * from base)
+select x::timestamp with time zone as y from final
+"""
+        assert SqlParser._extract_ctes(content) == ["base", "nested", "final"]
+
     def test_get_all_refs(self, tmp_dbt_project: Path) -> None:
         parser = SqlParser(tmp_dbt_project)
         parser.parse_all()
@@ -135,3 +156,41 @@ class TestSqlParser:
         parser = SqlParser(tmp_path)
         files = parser.find_sql_files()
         assert files == []
+
+    def test_file_cache_matches_fresh_parse(self, tmp_dbt_project: Path) -> None:
+        cache_path = tmp_dbt_project / ".cache" / "files-sql.pickle"
+        fresh = SqlParser(tmp_dbt_project).parse_all()
+        SqlParser(tmp_dbt_project, FileParseCache(cache_path)).parse_all()
+        assert cache_path.exists()
+        cached = SqlParser(tmp_dbt_project, FileParseCache(cache_path)).parse_all()
+        assert cached == fresh
+
+    def test_file_cache_skips_touched_unchanged_files(
+        self, tmp_dbt_project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        cache_path = tmp_dbt_project / ".cache" / "files-sql.pickle"
+        fresh = SqlParser(tmp_dbt_project, FileParseCache(cache_path)).parse_all()
+        for sql_file in (tmp_dbt_project / "models").rglob("*.sql"):
+            os.utime(sql_file, ns=(0, 0))
+
+        def fail(cls, filepath: Path, content: str) -> None:
+            raise AssertionError(f"reparseado: {filepath}")
+
+        monkeypatch.setattr(SqlParser, "_parse_content", classmethod(fail))
+        cached = SqlParser(tmp_dbt_project, FileParseCache(cache_path)).parse_all()
+        assert cached == fresh
+
+    def test_parallel_parse_matches_serial(
+        self, tmp_dbt_project: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("dbt_parser.utils.parallel.PARALLEL_MIN_FILES", 1)
+        monkeypatch.setattr("dbt_parser.utils.parallel.os.cpu_count", lambda: 2)
+        serial = SqlParser(tmp_dbt_project).parse_all()
+        parallel = SqlParser(tmp_dbt_project).parse_all(jobs=2)
+        assert parallel == serial
+        assert list(parallel) == list(serial)
+
+    def test_model_info_is_slotted(self, tmp_dbt_project: Path) -> None:
+        parser = SqlParser(tmp_dbt_project)
+        models = parser.parse_all()
+        assert not hasattr(next(iter(models.values())), "__dict__")
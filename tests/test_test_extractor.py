@@ -90,3 +90,31 @@ class TestTestExtractor:
         coverage = test_ext.get_test_coverage({"stg_events", "stg_dates"})
         assert coverage["total_models"] == 2
         assert coverage["tested_models"] == 1
+
+    def test_summary_refreshes_after_new_extraction(self, test_project: Path) -> None:
+        yaml_parser = YamlParser(test_project)
+        content = yaml_parser.parse_file(test_project / "models" / "schema.yml")
+        extractor = SchemaExtractor(yaml_parser)
+        extractor.extract_models(content)
+        test_ext = TestExtractor(extractor, test_project)
+        test_ext.extract_schema_tests()
+        schema_only = test_ext.get_test_summary()
+        assert schema_only["data"] == 0
+        test_ext.extract_data_tests()
+        summary = test_ext.get_test_summary()
+        assert summary["data"] == 1
+        assert summary["total"] == summary["schema"] + summary["data"] + summary["custom"]
+
+    def test_model_index_resets_on_extract_all(self, test_project: Path) -> None:
+        yaml_parser = YamlParser(test_project)
+        content = yaml_parser.parse_file(test_project / "models" / "schema.yml")
+        extractor = SchemaExtractor(yaml_parser)
+        extractor.extract_models(content)
+        test_ext = TestExtractor(extractor, test_project)
+        test_ext.extract_all()
+        test_ext.extract_all()
+        assert len(test_ext.get_tests_by_model("stg_events")) == 4
+        test_ext.get_tests_by_model("stg_events").clear()
+        assert len(test_ext.get_tests_by_model("stg_events")) == 4
+        assert test_ext.get_tests_by_model("missing") == []
+        assert test_ext.get_models_without_tests({"stg_events", "stg_dates"}) == {"stg_dates"}
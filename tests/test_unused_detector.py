@@ -48,3 +48,21 @@ class TestUnusedDetector:
         report = detector.generate_report()
         assert isinstance(report, UnusedReport)
         assert report.total_unused >= 0
+
+    def test_report_matches_individual_detectors(self, detector: UnusedDetector) -> None:
+        report = detector.generate_report(
+            exposure_models={"fct_final"},
+            known_macros={"m1", "m2"},
+            used_macros={"m1"},
+        )
+        assert report.unused_models == detector.detect_unused_models({"fct_final"})
+        assert report.orphan_sources == detector.detect_orphan_sources()
+        assert report.dead_end_models == detector.detect_dead_end_models()
+        assert report.unused_macros == ["m2"]
+        assert report.dead_end_models == ["fct_final", "unused_model"]
+
+    def test_exposures_and_macros_accept_lists(self, detector: UnusedDetector) -> None:
+        assert "fct_final" not in detector.detect_unused_models(["fct_final"])
+        report = detector.generate_report(["fct_final"], ["m1", "m2"], ["m1"])
+        assert "fct_final" not in report.unused_models
+        assert report.unused_macros == ["m2"]
@@ -111,6 +111,18 @@ class TestYamlParser:
         results = parser.parse_all()
         assert len(results) == 2
 
+    def test_threaded_parse_all_matches_serial_and_skips_invalid(
+        self, tmp_project: Path
+    ) -> None:
+        (tmp_project / "models" / "broken.yml").write_text("models: [unclosed\n")
+        serial = YamlParser(tmp_project).parse_all()
+        threaded_parser = YamlParser(tmp_project)
+        threaded = threaded_parser.parse_all(jobs=4)
+        assert threaded == serial
+        assert list(threaded) == list(serial)
+        assert len(threaded) == 2
+        assert threaded_parser.get_parsed_files() == threaded
+
     def test_extract_version(self, tmp_project: Path) -> None:
         parser = YamlParser(tmp_project)
         content = parser.parse_file(tmp_project / "models" / "schema.yml")
@@ -181,6 +193,14 @@ class TestSchemaExtractor:
         model = extractor.get_model_by_name("nonexistent")
         assert model is None
 
+    def test_get_model_by_name_keeps_first_definition(self, tmp_project: Path) -> None:
+        parser = YamlParser(tmp_project)
+        content = parser.parse_file(tmp_project / "models" / "schema.yml")
+        extractor = SchemaExtractor(parser)
+        first = extractor.extract_models(content)[0]
+        extractor.extract_models(content)
+        assert extractor.get_model_by_name(first.name) is first
+
     def test_get_column_tests(self, tmp_project: Path) -> None:
         parser = YamlParser(tmp_project)
         content = parser.parse_file(tmp_project / "models" / "schema.yml")